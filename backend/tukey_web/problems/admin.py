@@ -6,7 +6,16 @@ from .models import Problem, Example
 class ProblemAdmin(admin.ModelAdmin):
     list_display = ('id','title', 'difficulty', 'created_at')
     prepopulated_fields = {'slug': ('title',)}
+    actions = ['rejudge_solutions']
+
+    @admin.action(description="Reevaluar las soluciones de los problemas seleccionados")
+    def rejudge_solutions(self, request, queryset):
+        from solutions.tasks import rejudge_problem
+
+        for problem_id in queryset.values_list('id', flat=True):
+            rejudge_problem.delay(problem_id)
+        self.message_user(request, f"Reevaluación en cola para {queryset.count()} problema(s).")
     
 @admin.register(Example)
 class ExampleAdmin(admin.ModelAdmin):
-    list_display = ('problem', 'input_data', 'output_data')
\ No newline at end of file
+    list_display = ('problem', 'input_data', 'output_data')
@@ -0,0 +1,75 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control
+
+from tukey_web.cache_versions import bump_version, get_version, version_time
+
+# Tiempo de vida de cada versión del catálogo en la caché compartida (segundos)
+CATALOG_CACHE_TIMEOUT = getattr(settings, 'CATALOG_CACHE_TIMEOUT', 60 * 60 * 24)
+# Tiempo de vida de los problemas completados de cada usuario (segundos)
+COMPLETED_CACHE_TIMEOUT = 60 * 60
+
+_CATALOG_VERSION_KEY = 'catalog_version'
+
+
+def catalog_version():
+    """Versión del catálogo: problemas, ejemplos, etiquetas y categorías (ver problems.signals)."""
+    return get_version(_CATALOG_VERSION_KEY)
+
+
+def bump_catalog_version():
+    """Invalida todo lo que dependa del catálogo."""
+    bump_version(_CATALOG_VERSION_KEY)
+
+
+def catalog_last_modified():
+    return version_time(catalog_version())
+
+
+def cached_catalog(name, build):
+    """
+    Contenido `name` del catálogo en la versión actual; si no está en caché se arma con
+    `build()` y se guarda. Un resultado None (por ejemplo, un problema que no existe) no
+    se guarda.
+    """
+    key = f"catalog:{catalog_version()}:{name}"
+    payload = cache.get(key)
+    if payload is None:
+        payload = build()
+        if payload is not None:
+            cache.set(key, payload, CATALOG_CACHE_TIMEOUT)
+    return payload
+
+
+def completed_problem_ids(user):
+    """
+    Ids de los problemas que el usuario resolvió; es la parte del catálogo propia de
+    cada usuario. La llave incluye `problemas_resueltos`, que cambia al resolver un
+    problema nuevo, así que no hace falta invalidarla.
+    """
+    from solutions.models import Solution
+
+    key = f"catalog_completed:{user.pk}:{user.problemas_resueltos}"
+    problem_ids = cache.get(key)
+    if problem_ids is None:
+        problem_ids = list(
+            Solution.objects.filter(user=user, status='Accepted')
+            .values_list('problem_id', flat=True)
+            .distinct()
+        )
+        cache.set(key, problem_ids, COMPLETED_CACHE_TIMEOUT)
+    return set(problem_ids)
+
+
+def catalog_etag(name, user=None):
+    """ETag de `name` en la versión actual; con `user` también cambia al resolver un problema."""
+    tag = f"{catalog_version()}-{name}"
+    if user is not None:
+        tag = f"{tag}-{user.pk}.{user.problemas_resueltos}"
+    return f'"{tag}"'
+
+
+def revalidate(response):
+    """Permite guardar la respuesta en el navegador, pero obliga a revalidarla con el ETag."""
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
@@ -0,0 +1,136 @@
+from django.db.models import Count, Exists, OuterRef, Prefetch, Value
+
+from tags.models import Tag
+from .models import Problem
+
+# Campos que admite el catálogo y columnas de Problem que necesita cada uno
+CATALOG_FIELDS = {
+    'id': ('id',),
+    'title': ('title',),
+    'description': ('description',),
+    'difficulty': ('difficulty',),
+    'category': ('category__name',),
+    'tags': (),
+    'completed': (),
+    'points': ('points',),
+    'timeLimit': ('time',),
+}
+
+
+def parse_fields(value):
+    """
+    Lee el parámetro `fields` ("id,title,tags"). Devuelve None si no viene, es decir,
+    todos los campos; los nombres desconocidos se ignoran.
+    """
+    if not value:
+        return None
+    fields = [name for name in (part.strip() for part in value.split(',')) if name in CATALOG_FIELDS]
+    return fields or None
+
+
+def catalog_queryset(user, fields=None):
+    """
+    Problemas del catálogo en una sola consulta: la categoría viene por JOIN, las
+    etiquetas en una consulta aparte para toda la página y `completed` como subconsulta
+    EXISTS sobre las soluciones aceptadas del usuario. Solo se cargan las columnas de
+    `fields` (ver CATALOG_FIELDS).
+    """
+    fields = fields or list(CATALOG_FIELDS)
+    # created_at e id sostienen el orden de la paginación por cursor
+    columns = {'id', 'created_at'}
+    for name in fields:
+        columns.update(CATALOG_FIELDS[name])
+
+    queryset = Problem.objects.only(*columns)
+    if 'category' in fields:
+        queryset = queryset.select_related('category')
+    if 'tags' in fields:
+        queryset = queryset.prefetch_related(Prefetch('tags', queryset=Tag.objects.only('id', 'name')))
+    if 'completed' in fields:
+        queryset = queryset.annotate(completed=completed_by(user))
+    return queryset.order_by('-created_at', '-id')
+
+
+def completed_by(user):
+    """Expresión booleana: el usuario tiene una solución aceptada del problema."""
+    from solutions.models import Solution
+
+    if not user.is_authenticated:
+        return Value(False)
+    return Exists(Solution.objects.filter(user=user, problem=OuterRef('pk'), status='Accepted'))
+
+
+def _ids(values):
+    return [int(value) for value in values if value.isdigit()]
+
+
+def parse_filters(params):
+    """
+    Filtros del catálogo desde los parámetros: ?difficulty=, ?category= y ?tag= se
+    pueden repetir (basta con coincidir con uno) y ?solved=true|false. Los valores
+    inválidos se ignoran.
+    """
+    difficulties = {value for value, _ in Problem.DIFFICULTY_CHOICES}
+    return {
+        'difficulty': [value for value in params.getlist('difficulty') if value in difficulties],
+        'category': _ids(params.getlist('category')),
+        'tag': _ids(params.getlist('tag')),
+        'solved': {'true': True, 'false': False}.get(params.get('solved')),
+    }
+
+
+def filter_catalog(queryset, user, filters, exclude=None):
+    """Aplica los filtros de parse_filters, salvo el de la faceta `exclude`."""
+    if filters['difficulty'] and exclude != 'difficulty':
+        queryset = queryset.filter(difficulty__in=filters['difficulty'])
+    if filters['category'] and exclude != 'category':
+        queryset = queryset.filter(category_id__in=filters['category'])
+    if filters['tag'] and exclude != 'tag':
+        # EXISTS en lugar de un JOIN, para no repetir problemas con varias etiquetas
+        queryset = queryset.filter(Exists(
+            Problem.tags.through.objects.filter(problem_id=OuterRef('pk'), tag_id__in=filters['tag'])
+        ))
+    if filters['solved'] is not None and exclude != 'solved':
+        solved = completed_by(user)
+        queryset = queryset.filter(solved if filters['solved'] else ~solved)
+    return queryset
+
+
+def catalog_facets(user, filters):
+    """
+    Cantidad de problemas por dificultad, categoría, etiqueta y resuelto/no resuelto,
+    cada una con un GROUP BY en la base de datos. Cada faceta se cuenta con los filtros
+    de las demás, así muestra cuántos problemas habría al elegir cada opción.
+    """
+    problems = Problem.objects.order_by()
+
+    difficulty = dict(
+        filter_catalog(problems, user, filters, exclude='difficulty')
+        .values_list('difficulty').annotate(count=Count('pk'))
+    )
+    categories = (
+        filter_catalog(problems, user, filters, exclude='category')
+        .values('category_id', 'category__name').annotate(count=Count('pk'))
+        .order_by('category__name')
+    )
+    tags = (
+        Problem.tags.through.objects
+        .filter(problem__in=filter_catalog(problems, user, filters, exclude='tag'))
+        .values('tag_id', 'tag__name').annotate(count=Count('problem_id'))
+        .order_by('tag__name')
+    )
+    solved = filter_catalog(problems, user, filters, exclude='solved').aggregate(
+        total=Count('pk'),
+        solved=Count('pk', filter=completed_by(user)),
+    )
+
+    return {
+        'difficulty': [
+            {'value': value, 'count': difficulty.get(value, 0)} for value, _ in Problem.DIFFICULTY_CHOICES
+        ],
+        'category': [
+            {'id': row['category_id'], 'name': row['category__name'], 'count': row['count']} for row in categories
+        ],
+        'tag': [{'id': row['tag_id'], 'name': row['tag__name'], 'count': row['count']} for row in tags],
+        'solved': {'solved': solved['solved'], 'unsolved': solved['total'] - solved['solved']},
+    }
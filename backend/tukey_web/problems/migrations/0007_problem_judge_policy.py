@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0006_problem_points_problem_time'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='judge_policy',
+            field=models.CharField(choices=[('full_report', 'Full report'), ('fail_fast', 'Fail fast')], default='full_report', max_length=20),
+        ),
+    ]
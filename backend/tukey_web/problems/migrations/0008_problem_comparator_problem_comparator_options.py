@@ -0,0 +1,23 @@
+# Generated by Django 5.1.4 on 2026-10-18 10:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0007_problem_judge_policy'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='comparator',
+            field=models.CharField(choices=[('float', 'Float tolerance'), ('exact', 'Exact'), ('unordered', 'Unordered')], default='float', max_length=20),
+        ),
+        migrations.AddField(
+            model_name='problem',
+            name='comparator_options',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
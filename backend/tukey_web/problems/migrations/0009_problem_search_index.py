@@ -0,0 +1,64 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:40
+
+from django.db import migrations
+
+
+def create_search_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE problems_search USING fts5("
+            "problem_id UNINDEXED, title, tags, category, description, "
+            "tokenize = 'unicode61 remove_diacritics 2')"
+        )
+        insert = (
+            "INSERT INTO problems_search (problem_id, title, tags, category, description) "
+            "VALUES (%s, %s, %s, %s, %s)"
+        )
+    elif vendor == 'postgresql':
+        schema_editor.execute(
+            "CREATE TABLE problems_search ("
+            "problem_id bigint PRIMARY KEY REFERENCES problems_problem (id) "
+            "ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+            "document tsvector NOT NULL)"
+        )
+        schema_editor.execute("CREATE INDEX problems_search_document ON problems_search USING GIN (document)")
+        insert = (
+            "INSERT INTO problems_search (problem_id, document) VALUES (%s, "
+            "setweight(to_tsvector('simple', %s), 'A') || setweight(to_tsvector('simple', %s), 'B') || "
+            "setweight(to_tsvector('simple', %s), 'B') || setweight(to_tsvector('simple', %s), 'C'))"
+        )
+    else:
+        # Otros motores buscan sin índice (ver problems.search)
+        return
+
+    Problem = apps.get_model('problems', 'Problem')
+    documents = [
+        (
+            problem.id,
+            problem.title,
+            ' '.join(tag.name for tag in problem.tags.all()),
+            problem.category.name if problem.category else '',
+            problem.description,
+        )
+        for problem in Problem.objects.select_related('category').prefetch_related('tags')
+    ]
+    with schema_editor.connection.cursor() as cursor:
+        cursor.executemany(insert, documents)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor in ('sqlite', 'postgresql'):
+        schema_editor.execute("DROP TABLE IF EXISTS problems_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0008_problem_comparator_problem_comparator_options'),
+        ('tags', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
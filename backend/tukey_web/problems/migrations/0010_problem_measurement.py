@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0009_problem_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='measurement',
+            field=models.CharField(blank=True, choices=[('rusage', 'Rusage'), ('tracemalloc', 'Tracemalloc')], default='', max_length=20),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 21:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('problems', '0010_problem_measurement'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='problem',
+            name='parallel_sandboxes',
+            field=models.PositiveSmallIntegerField(blank=True, null=True),
+        ),
+    ]
@@ -9,6 +9,23 @@ class Problem(models.Model):
         ('Hard', 'Hard'),
     ]
 
+    JUDGE_POLICY_CHOICES = [
+        ('full_report', 'Full report'),  # Ejecuta todos los casos (práctica)
+        ('fail_fast', 'Fail fast'),  # Se detiene en el primer caso que no pasa (evaluación)
+    ]
+
+    # Ver testcases.comparators.OutputComparator
+    COMPARATOR_CHOICES = [
+        ('float', 'Float tolerance'),
+        ('exact', 'Exact'),
+        ('unordered', 'Unordered'),
+    ]
+
+    MEASUREMENT_CHOICES = [
+        ('rusage', 'Rusage'),  # Barato: RSS pico del sandbox
+        ('tracemalloc', 'Tracemalloc'),  # Perfil de memoria preciso, más lento
+    ]
+
     title = models.CharField(max_length=255)
     slug = models.SlugField(unique=True, max_length=255)
     description = models.TextField()
@@ -20,6 +37,14 @@ class Problem(models.Model):
     formula = models.TextField(blank=True, null=True)
     points = models.IntegerField(default=10)
     time = models.IntegerField(default=15)
+    judge_policy = models.CharField(max_length=20, choices=JUDGE_POLICY_CHOICES, default='full_report')
+    comparator = models.CharField(max_length=20, choices=COMPARATOR_CHOICES, default='float')
+    comparator_options = models.JSONField(default=dict, blank=True)  # {"abs_tol": 1e-6, "rel_tol": 0.0}
+    # Ver solutions.measurement; vacío usa JUDGE_MEASUREMENT_BACKEND
+    measurement = models.CharField(max_length=20, choices=MEASUREMENT_CHOICES, blank=True, default='')
+    # Sandbox entre los que se reparten los casos; vacío usa JUDGE_PARALLEL_SANDBOXES y 1 los
+    # corre en orden (casos que dependen del orden o que usan muchos recursos)
+    parallel_sandboxes = models.PositiveSmallIntegerField(blank=True, null=True)
     class Meta:
         ordering = ['-created_at']
 
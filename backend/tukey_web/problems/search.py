@@ -0,0 +1,105 @@
+import re
+
+from django.db import connection
+
+from .models import Problem
+
+# Índice de texto de los problemas, creado por la migración 0009_problem_search_index:
+# FTS5 en SQLite y una columna tsvector con índice GIN en PostgreSQL
+SEARCH_TABLE = 'problems_search'
+# Términos máximos que se toman de una búsqueda
+MAX_TERMS = 8
+
+# Peso de cada columna del índice FTS5 para bm25 (problem_id no se indexa)
+_FTS5_WEIGHTS = '0.0, 10.0, 4.0, 4.0, 1.0'
+# Documento de PostgreSQL: el título pesa más que etiquetas y categoría, y estas más que la descripción
+_PG_DOCUMENT = (
+    "setweight(to_tsvector('simple', %s), 'A')"
+    " || setweight(to_tsvector('simple', %s), 'B')"
+    " || setweight(to_tsvector('simple', %s), 'B')"
+    " || setweight(to_tsvector('simple', %s), 'C')"
+)
+
+
+def search_supported():
+    return connection.vendor in ('sqlite', 'postgresql')
+
+
+def search_terms(text):
+    """Palabras de la búsqueda en minúsculas; cada una se busca también como prefijo."""
+    return re.findall(r'\w+', text.lower())[:MAX_TERMS]
+
+
+def _documents(problem_ids):
+    problems = (
+        Problem.objects.filter(pk__in=problem_ids)
+        .select_related('category')
+        .prefetch_related('tags')
+        .only('id', 'title', 'description', 'category__name')
+    )
+    return [
+        (
+            problem.id,
+            problem.title,
+            ' '.join(tag.name for tag in problem.tags.all()),
+            problem.category.name if problem.category else '',
+            problem.description,
+        )
+        for problem in problems
+    ]
+
+
+def index_problems(problem_ids):
+    """Vuelve a indexar los problemas; los que ya no existen se quitan del índice."""
+    problem_ids = list(problem_ids)
+    if not problem_ids or not search_supported():
+        return
+    documents = _documents(problem_ids)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"DELETE FROM {SEARCH_TABLE} WHERE problem_id IN ({', '.join(['%s'] * len(problem_ids))})",
+                problem_ids,
+            )
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (problem_id, title, tags, category, description)"
+                " VALUES (%s, %s, %s, %s, %s)",
+                documents,
+            )
+        else:
+            cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE problem_id = ANY(%s)", [problem_ids])
+            cursor.executemany(
+                f"INSERT INTO {SEARCH_TABLE} (problem_id, document) VALUES (%s, {_PG_DOCUMENT})",
+                documents,
+            )
+
+
+def search_problems(text, limit=20):
+    """
+    Ids de los problemas que contienen todos los términos (como palabra o prefijo),
+    del más al menos relevante. En SQLite se ordena con bm25 y en PostgreSQL con ts_rank.
+    """
+    terms = search_terms(text)
+    if not terms:
+        return []
+    if not search_supported():
+        # Sin índice de texto se busca solo en el título
+        queryset = Problem.objects.all()
+        for term in terms:
+            queryset = queryset.filter(title__icontains=term)
+        return list(queryset.values_list('id', flat=True)[:limit])
+
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(
+                f"SELECT problem_id FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s"
+                f" ORDER BY bm25({SEARCH_TABLE}, {_FTS5_WEIGHTS}) LIMIT %s",
+                [' '.join(f'"{term}"*' for term in terms), limit],
+            )
+        else:
+            cursor.execute(
+                f"SELECT problem_id FROM {SEARCH_TABLE}, to_tsquery('simple', %s) query"
+                " WHERE document @@ query ORDER BY ts_rank(document, query) DESC, problem_id LIMIT %s",
+                [' & '.join(f'{term}:*' for term in terms), limit],
+            )
+        return [int(row[0]) for row in cursor.fetchall()]
@@ -0,0 +1,24 @@
+from rest_framework import serializers
+from .models import Problem
+
+
+class ProblemCatalogSerializer(serializers.ModelSerializer):
+    """
+    Fila del catálogo de problemas. Espera el queryset de problems.catalog, que ya trae
+    la categoría, las etiquetas y la anotación `completed`. Con `fields` se devuelven
+    solo esos campos.
+    """
+    category = serializers.CharField(source='category.name', allow_null=True, read_only=True)
+    tags = serializers.SlugRelatedField(many=True, read_only=True, slug_field='name')
+    completed = serializers.BooleanField(read_only=True)
+    timeLimit = serializers.IntegerField(source='time', read_only=True)
+
+    class Meta:
+        model = Problem
+        fields = ['id', 'title', 'description', 'difficulty', 'category', 'tags', 'completed', 'points', 'timeLimit']
+
+    def __init__(self, *args, fields=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for name in set(self.fields) - set(fields):
+                self.fields.pop(name)
@@ -0,0 +1,71 @@
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from tags.models import Category, Tag
+from .models import Example, Problem
+from .cache import bump_catalog_version
+from .search import index_problems
+
+CATALOG_MODELS = (Problem, Example, Tag, Category)
+
+
+def invalidate_catalog(sender, **kwargs):
+    """
+    Cambia la versión del catálogo al crear, editar o borrar un problema, ejemplo,
+    etiqueta o categoría, o al cambiar las etiquetas de un problema. Se hace al
+    confirmar la transacción para no guardar en caché datos sin confirmar.
+    """
+    transaction.on_commit(bump_catalog_version)
+
+
+def reindex_on_commit(problem_ids):
+    """Actualiza el índice de búsqueda de los problemas al confirmar la transacción."""
+    problem_ids = list(problem_ids)
+    if problem_ids:
+        transaction.on_commit(lambda: index_problems(problem_ids))
+
+
+for model in CATALOG_MODELS:
+    post_save.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_save_{model.__name__}')
+    post_delete.connect(invalidate_catalog, sender=model, dispatch_uid=f'catalog_delete_{model.__name__}')
+
+
+@receiver(m2m_changed, sender=Problem.tags.through)
+def problem_tags_changed(sender, instance, action, reverse, pk_set, **kwargs):
+    if action == 'pre_clear' and reverse:
+        # Al vaciar los problemas de una etiqueta, después ya no se sabe cuáles eran
+        instance._search_problem_ids = list(instance.problems.values_list('id', flat=True))
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        invalidate_catalog(sender)
+        if not reverse:
+            reindex_on_commit([instance.pk])
+        elif action == 'post_clear':
+            reindex_on_commit(getattr(instance, '_search_problem_ids', []))
+        else:
+            reindex_on_commit(pk_set)
+
+
+@receiver(post_save, sender=Problem)
+@receiver(post_delete, sender=Problem)
+def reindex_problem(sender, instance, **kwargs):
+    reindex_on_commit([instance.pk])
+
+
+@receiver(pre_delete, sender=Tag)
+@receiver(pre_delete, sender=Category)
+def remember_indexed_problems(sender, instance, **kwargs):
+    # Al borrarse, la relación con los problemas desaparece sin señales propias
+    instance._search_problem_ids = list(instance.problems.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Tag)
+@receiver(post_save, sender=Category)
+def reindex_renamed(sender, instance, created, **kwargs):
+    if not created:
+        reindex_on_commit(instance.problems.values_list('id', flat=True))
+
+
+@receiver(post_delete, sender=Tag)
+@receiver(post_delete, sender=Category)
+def reindex_orphaned(sender, instance, **kwargs):
+    reindex_on_commit(getattr(instance, '_search_problem_ids', []))
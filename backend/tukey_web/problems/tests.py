@@ -1,3 +1,57 @@
-from django.test import TestCase
+from django.test import TestCase, override_settings
 
-# Create your tests here.
+from tags.models import Category, Tag
+
+from .models import Problem
+from .search import search_problems
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class SearchIndexSyncTests(TestCase):
+    """El índice de búsqueda se actualiza al confirmar cada cambio (ver problems.signals)."""
+
+    def commit(self, change, *args, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return change(*args, **kwargs)
+
+    def setUp(self):
+        self.category = self.commit(Category.objects.create, name='Estadística')
+        self.tag = self.commit(Tag.objects.create, name='probabilidad')
+        self.problem = self.commit(
+            Problem.objects.create,
+            title='Media aritmética', description='Calcula el promedio de una lista',
+            difficulty='Easy', category=self.category,
+        )
+        self.commit(self.problem.tags.add, self.tag)
+
+    def test_new_problem_is_searchable_by_title_prefix_and_category(self):
+        self.assertEqual(search_problems('media'), [self.problem.id])
+        self.assertEqual(search_problems('prom'), [self.problem.id])
+        self.assertEqual(search_problems('estadistica'), [self.problem.id])
+
+    def test_problem_edit_is_reindexed(self):
+        self.problem.title = 'Mediana'
+        self.commit(self.problem.save)
+        self.assertEqual(search_problems('mediana'), [self.problem.id])
+        self.assertEqual(search_problems('aritmetica'), [])
+
+    def test_tag_changes_are_reindexed(self):
+        self.assertEqual(search_problems('probabilidad'), [self.problem.id])
+
+        self.tag.name = 'bayes'
+        self.commit(self.tag.save)
+        self.assertEqual(search_problems('bayes'), [self.problem.id])
+        self.assertEqual(search_problems('probabilidad'), [])
+
+        self.commit(self.tag.problems.clear)
+        self.assertEqual(search_problems('bayes'), [])
+
+    def test_deleted_category_and_problem_leave_the_index(self):
+        self.commit(self.category.delete)
+        self.assertEqual(search_problems('estadistica'), [])
+
+        problem_id = self.problem.id
+        self.commit(self.problem.delete)
+        self.assertNotIn(problem_id, search_problems('media'))
@@ -1,10 +1,14 @@
 from django.urls import path
 from .views import (
     ProblemListView,
+    ProblemCatalogView,
+    ProblemSearchView,
     ProblemDetailView
 )
 
 urlpatterns = [
     path('list/', ProblemListView.as_view(), name='list_problems'),
+    path('catalog/', ProblemCatalogView.as_view(), name='problem_catalog'),
+    path('search/', ProblemSearchView.as_view(), name='problem_search'),
     path('<int:id>/', ProblemDetailView.as_view(), name='detail_problem'),
 ]
@@ -1,55 +1,134 @@
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.views import APIView
 from rest_framework.response import Response
-from rest_framework import status
+from rest_framework import generics, status
+from rest_framework.pagination import CursorPagination
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+from .cache import (
+    cached_catalog,
+    catalog_etag,
+    catalog_last_modified,
+    completed_problem_ids,
+    revalidate,
+)
+from .catalog import CATALOG_FIELDS, catalog_facets, catalog_queryset, filter_catalog, parse_fields, parse_filters
 from .models import Problem
+from .search import search_problems
+from .serializers import ProblemCatalogSerializer
 
 
 class ProblemListView(APIView):
+    """
+    Catálogo completo. La lista compartida sale de la caché del catálogo y solo la
+    marca `completed` se arma por usuario (ver problems.cache). Solo lleva ETag: el
+    Last-Modified del catálogo no cambia cuando el usuario resuelve un problema.
+    """
     permission_classes = [IsAuthenticated]  # Requiere autenticación
 
+    @method_decorator(condition(etag_func=lambda request: catalog_etag('list', request.user)))
     def get(self, request):
-        problems = Problem.objects.all()
-        data = [
-            {
-                "id": problem.id,
-                "title": problem.title,
-                "description": problem.description,
-                "difficulty": problem.difficulty,
-                "category": problem.category.name if problem.category else None,
-                "tags": [tag.name for tag in problem.tags.all()],
-                "completed": problem.is_completed_by_user(request.user),
-                "points": problem.points,
-                "timeLimit": problem.time,
-            }
-            for problem in problems
-        ]
-        return Response({"problems": data}, status=status.HTTP_200_OK)
+        fields = [name for name in CATALOG_FIELDS if name != 'completed']
+        problems = cached_catalog('list', lambda: list(
+            ProblemCatalogSerializer(catalog_queryset(request.user, fields), many=True, fields=fields).data
+        ))
+        completed = completed_problem_ids(request.user)
+        data = [dict(problem, completed=problem['id'] in completed) for problem in problems]
+        return revalidate(Response({"problems": data}, status=status.HTTP_200_OK))
+
+
+class ProblemCatalogPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-created_at', '-id')
+
+
+class ProblemCatalogView(generics.ListAPIView):
+    """
+    Catálogo de problemas paginado por cursor (?cursor=, ?page_size=). Con
+    ?fields=id,title,... se devuelven solo esos campos, y ?difficulty=, ?category=,
+    ?tag= y ?solved= filtran la lista. La respuesta incluye en `facets` los conteos
+    para los filtros (ver problems.catalog).
+    """
+    permission_classes = [IsAuthenticated]
+    pagination_class = ProblemCatalogPagination
+
+    def get_fields(self):
+        return parse_fields(self.request.query_params.get('fields'))
+
+    def get_filters(self):
+        return parse_filters(self.request.query_params)
+
+    def get_queryset(self):
+        queryset = catalog_queryset(self.request.user, self.get_fields())
+        return filter_catalog(queryset, self.request.user, self.get_filters())
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        response.data['facets'] = catalog_facets(request.user, self.get_filters())
+        return response
+
+    def get_serializer(self, *args, **kwargs):
+        return ProblemCatalogSerializer(*args, fields=self.get_fields(), **kwargs)
+
+class ProblemSearchView(APIView):
+    """
+    Búsqueda en título, descripción, etiquetas y categoría (?q=). Cada palabra se busca
+    también como prefijo y los resultados vienen del más al menos relevante. Por defecto
+    no incluye la descripción; ?fields= elige los campos como en el catálogo.
+    """
+    permission_classes = [IsAuthenticated]
+    default_fields = [name for name in CATALOG_FIELDS if name != 'description']
+    max_limit = 50
+
+    def get(self, request):
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), self.max_limit))
+        except ValueError:
+            return Response({"error": "limit must be an integer"}, status=status.HTTP_400_BAD_REQUEST)
+
+        problem_ids = search_problems(request.query_params.get('q', ''), limit)
+        fields = parse_fields(request.query_params.get('fields')) or self.default_fields
+        problems = catalog_queryset(request.user, fields).in_bulk(problem_ids)
+        ranked = [problems[problem_id] for problem_id in problem_ids if problem_id in problems]
+        data = ProblemCatalogSerializer(ranked, many=True, fields=fields).data
+        return Response({"results": data}, status=status.HTTP_200_OK)
+
 
 class ProblemDetailView(APIView):
     permission_classes = [IsAuthenticated]
 
+    @method_decorator(condition(
+        etag_func=lambda request, id: catalog_etag(f'problem:{id}'),
+        last_modified_func=lambda request, id: catalog_last_modified(),
+    ))
     def get(self, request, id):
+        data = cached_catalog(f'problem:{id}', lambda: self.build(id))
+        if data is None:
+            return Response({"error": "Problem not found"}, status=status.HTTP_404_NOT_FOUND)
+        return revalidate(Response(data, status=status.HTTP_200_OK))
+
+    def build(self, id):
         try:
-            problem = Problem.objects.get(id=id)
-            examples = [
-                {
-                    "input": example.input_data,
-                    "output": example.output_data,
-                    "explanation": example.explanation,
-                }
-                for example in problem.examples.all()
-            ]
-            data = {
-                "id": problem.id,
-                "title": problem.title,
-                "description": problem.description,
-                "difficulty": problem.difficulty,
-                "category": problem.category.name if problem.category else None,
-                "tags": [tag.name for tag in problem.tags.all()],
-                "examples": examples,
-                "formula": problem.formula,
-            }
-            return Response(data, status=status.HTTP_200_OK)
+            problem = Problem.objects.select_related('category').prefetch_related('tags', 'examples').get(id=id)
         except Problem.DoesNotExist:
-            return Response({"error": "Problem not found"}, status=status.HTTP_404_NOT_FOUND)
+            return None
+        examples = [
+            {
+                "input": example.input_data,
+                "output": example.output_data,
+                "explanation": example.explanation,
+            }
+            for example in problem.examples.all()
+        ]
+        return {
+            "id": problem.id,
+            "title": problem.title,
+            "description": problem.description,
+            "difficulty": problem.difficulty,
+            "category": problem.category.name if problem.category else None,
+            "tags": [tag.name for tag in problem.tags.all()],
+            "examples": examples,
+            "formula": problem.formula,
+        }
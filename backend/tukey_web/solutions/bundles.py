@@ -0,0 +1,146 @@
+import ast
+import json
+import logging
+import threading
+from collections import OrderedDict, namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from testcases.cache import testset_version
+from testcases.models import TestCase
+
+logger = logging.getLogger(__name__)
+
+# Paquetes de prueba que cada worker mantiene en memoria
+LOCAL_BUNDLE_CACHE_SIZE = getattr(settings, 'JUDGE_TEST_BUNDLE_CACHE_SIZE', 128)
+# Tiempo de vida del paquete serializado en la caché compartida (segundos)
+SHARED_BUNDLE_TIMEOUT = getattr(settings, 'JUDGE_TEST_BUNDLE_TIMEOUT', 60 * 60 * 24)
+
+# Caso de prueba ya parseado; `error` tiene el mensaje si la entrada o la salida no se pudieron leer
+# `as_text` indica que la salida esperada no es JSON y se compara como texto (ver bundle_case)
+BundledTestCase = namedtuple(
+    'BundledTestCase',
+    ['id', 'input', 'expected_output', 'visibility', 'parsed_input', 'expected', 'error', 'as_text'],
+    defaults=(False,),
+)
+
+# Casos de prueba de un problema en una versión concreta del conjunto
+TestBundle = namedtuple('TestBundle', ['problem_id', 'version', 'cases'])
+
+_local_bundles = OrderedDict()
+_local_lock = threading.Lock()
+
+
+def parse_input(input_str):
+    """
+    Parsea entradas flexiblemente
+    Soporta JSON, literales de Python, y cadenas simples
+    """
+    # Si input_str es una lista, conviértelo a JSON
+    if isinstance(input_str, list):
+        input_str = json.dumps(input_str)
+
+    input_str = str(input_str).strip()
+
+    try:
+        # Primero intenta parsear como JSON
+        return json.loads(input_str)
+    except json.JSONDecodeError as e:
+        logger.debug(f"JSON Decode Error: {e}")
+        # Si falla, intenta como literal de Python
+        try:
+            return ast.literal_eval(input_str)
+        except (SyntaxError, ValueError) as e:
+            logger.debug(f"Literal Eval Error: {e}")
+            # Si falla, intenta separar por comas
+            try:
+                return [x.strip() for x in input_str.split(',')]
+            except Exception as e:
+                logger.debug(f"Final parsing Error: {e}")
+                raise ValueError(f"No se pudo parsear la entrada: {input_str}")
+
+
+def parse_expected_output(expected_output):
+    """Parsea la salida esperada y la normaliza a lista como lo hace el juez."""
+    if isinstance(expected_output, str):
+        expected_output = json.loads(expected_output)
+
+    if isinstance(expected_output, (int, float)):
+        expected_output = [expected_output]
+    elif isinstance(expected_output, tuple):
+        expected_output = list(expected_output)
+    return expected_output
+
+
+def bundle_case(case_id, input_data, expected_output, visibility=True, text_fallback=False):
+    """
+    Parsea un caso (de prueba, ejemplo o entrada propia); sin salida esperada solo se parsea la entrada.
+    Con `text_fallback`, una salida esperada que no es JSON (p. ej. la de un ejemplo escrito
+    a mano) se compara como texto en lugar de marcar el caso como error.
+    """
+    parsed_input = expected = error = None
+    as_text = False
+    try:
+        parsed_input = parse_input(input_data)
+        expected = parse_expected_output(expected_output)
+    except json.JSONDecodeError as je:
+        if text_fallback:
+            expected = expected_output.strip()
+            as_text = True
+        else:
+            error = f'Error en formato de salida: {str(je)}'
+    except Exception as e:
+        error = str(e)
+
+    return BundledTestCase(
+        id=case_id,
+        input=input_data,
+        expected_output=expected_output,
+        visibility=visibility,
+        parsed_input=parsed_input,
+        expected=expected,
+        error=error,
+        as_text=as_text,
+    )
+
+
+def bundle_testcase(testcase):
+    return bundle_case(testcase.id, testcase.input, testcase.expected_output, testcase.visibility)
+
+
+def build_test_bundle(problem_id, version):
+    testcases = TestCase.objects.filter(problem_id=problem_id).order_by('id')
+    return TestBundle(
+        problem_id=problem_id,
+        version=version,
+        cases=tuple(bundle_testcase(testcase) for testcase in testcases),
+    )
+
+
+def get_test_bundle(problem_id):
+    """
+    Devuelve los casos de prueba parseados del problema.
+    Busca primero en la LRU local del worker, luego en la caché compartida y solo
+    construye el paquete desde la base de datos cuando cambió la versión de los casos.
+    """
+    version = testset_version(problem_id)
+    local_key = (problem_id, version)
+
+    with _local_lock:
+        bundle = _local_bundles.get(local_key)
+        if bundle is not None:
+            _local_bundles.move_to_end(local_key)
+            return bundle
+
+    shared_key = f"test_bundle:{problem_id}:{version}"
+    bundle = cache.get(shared_key)
+    if bundle is None:
+        bundle = build_test_bundle(problem_id, version)
+        cache.set(shared_key, bundle, SHARED_BUNDLE_TIMEOUT)
+
+    with _local_lock:
+        _local_bundles[local_key] = bundle
+        while len(_local_bundles) > LOCAL_BUNDLE_CACHE_SIZE:
+            _local_bundles.popitem(last=False)
+    return bundle
@@ -0,0 +1,86 @@
+import json
+from dataclasses import asdict, dataclass
+from typing import Any, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson es opcional; sin él se serializa con json
+    orjson = None
+
+
+def dumps(data):
+    """Serializa un evento a texto JSON compacto."""
+    if orjson is not None:
+        return orjson.dumps(data).decode('utf-8')
+    return json.dumps(data, separators=(',', ':'))
+
+
+def tag_frame(frame, **tags):
+    """
+    Agrega campos a un evento ya serializado sin volver a parsearlo.
+    Lo usa el socket por usuario para etiquetar el progreso de cada solución.
+    """
+    return dumps(tags)[:-1] + ',' + frame[1:]
+
+
+@dataclass(frozen=True)
+class TestCaseEvent:
+    """
+    Resultado de un caso de prueba. `status` y `message` mantienen el formato
+    que ya lee el frontend ("Running", "Test case N/M: ...").
+    La entrada y las salidas solo se incluyen en los casos visibles.
+    """
+    test_case_number: int
+    total_test_cases: int
+    test_status: str
+    input: Any = None
+    output: Any = None
+    expected: Any = None
+    execution_time: Optional[float] = None
+    peak_memory: Optional[float] = None
+    error_message: Optional[str] = None
+
+    @classmethod
+    def from_result(cls, index, total_test_cases, result, testcase=None):
+        """Construye el evento desde un resultado de solutions.tasks.grade_execution."""
+        visible = testcase is not None and testcase.visibility
+        failed = result['status'] not in ('Passed', 'Failed', 'Skipped')
+        return cls(
+            test_case_number=index + 1,
+            total_test_cases=total_test_cases,
+            test_status=result['status'],
+            input=testcase.input if visible else None,
+            output=result['output'] if visible or failed else None,
+            expected=result.get('expected') if visible else None,
+            execution_time=result['execution_time'],
+            peak_memory=result['peak_memory'],
+            error_message=result['output'] if failed else None,
+        )
+
+    def to_dict(self):
+        if self.test_status == 'Error':
+            status, detail = 'Error', f"Error: {self.error_message}"
+        else:
+            status, detail = 'Running', self.test_status
+        return dict(
+            asdict(self),
+            event='test_case',
+            status=status,
+            message=f"Test case {self.test_case_number}/{self.total_test_cases}: {detail}",
+        )
+
+
+@dataclass(frozen=True)
+class CompletedEvent:
+    """Veredicto final de la solución."""
+    verdict: str
+    total_test_cases: int
+    detail: Optional[str] = None
+
+    def to_dict(self):
+        return dict(
+            asdict(self),
+            event='completed',
+            status='Completed',
+            message=f"Test case {self.total_test_cases}/{self.total_test_cases}: Solution {self.verdict}",
+        )
@@ -0,0 +1,76 @@
+import platform
+import time
+import tracemalloc
+
+from django.conf import settings
+
+# Backend de medición por defecto: "rusage" (barato) o "tracemalloc" (perfil de memoria preciso)
+DEFAULT_BACKEND = getattr(settings, 'JUDGE_MEASUREMENT_BACKEND', 'rusage')
+
+# RSS del proceso sandbox antes de ejecutar código de usuario, en MB
+_baseline_rss_mb = 0.0
+
+
+def peak_rss_mb():
+    """RSS pico del proceso actual en MB, o None si el sistema no lo soporta."""
+    if platform.system() == "Windows":
+        return None
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reporta KB y macOS bytes
+    if platform.system() == "Darwin":
+        return peak / (1024 * 1024)
+    return peak / 1024
+
+
+def set_rss_baseline():
+    """Registra el RSS actual como base; se llama una vez al arrancar el proceso sandbox."""
+    global _baseline_rss_mb
+    _baseline_rss_mb = peak_rss_mb() or 0.0
+
+
+class RusageMeter:
+    """
+    Medición barata: tiempo de reloj y RSS pico del sandbox sobre su base.
+    El RSS pico es acumulado, así que dentro de un mismo sandbox reporta el máximo hasta ese caso.
+    """
+
+    def __enter__(self):
+        self._start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.execution_time = time.perf_counter() - self._start_wall
+        peak = peak_rss_mb()
+        self.peak_memory = max(0.0, peak - _baseline_rss_mb) if peak is not None else None
+        return False
+
+
+class TracemallocMeter:
+    """Perfil de memoria preciso con tracemalloc; hace más lenta la ejecución del código."""
+
+    def __enter__(self):
+        tracemalloc.start()
+        self._start_wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.execution_time = time.perf_counter() - self._start_wall
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        self.peak_memory = peak / (1024 * 1024)
+        return False
+
+
+MEASUREMENT_BACKENDS = {
+    'rusage': RusageMeter,
+    'tracemalloc': TracemallocMeter,
+}
+
+
+def get_meter(backend=None):
+    """
+    Crea un medidor del backend indicado o del configurado por defecto. Cada problema
+    puede elegir su backend (Problem.measurement); el juez lo pasa hasta run_solution.
+    """
+    return MEASUREMENT_BACKENDS[backend or DEFAULT_BACKEND]()
@@ -0,0 +1,32 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solutions', '0002_alter_solution_memory_alter_solution_problem_and_more'),
+        ('testcases', '0002_rename_output_testcase_expected_output_and_more'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='solutiontestcaseresult',
+            options={'ordering': ['id']},
+        ),
+        migrations.AlterField(
+            model_name='solutiontestcaseresult',
+            name='expected_output',
+            field=models.TextField(blank=True, null=True),
+        ),
+        migrations.AlterField(
+            model_name='solutiontestcaseresult',
+            name='status',
+            field=models.CharField(choices=[('Passed', 'Passed'), ('Failed', 'Failed'), ('Skipped', 'Skipped'), ('Error', 'Error'), ('Runtime Error', 'Runtime Error'), ('Memory Limit Exceeded', 'Memory Limit Exceeded'), ('Time Limit Exceeded', 'Time Limit Exceeded')], max_length=30),
+        ),
+        migrations.AddIndex(
+            model_name='solutiontestcaseresult',
+            index=models.Index(fields=['solution', 'status'], name='solutions_s_solutio_16f916_idx'),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.1.4 on 2026-10-18 19:10
+
+from django.db import migrations, models
+
+
+def mark_judged_as_applied(apps, schema_editor):
+    # Las soluciones ya calificadas están contadas en las estadísticas del usuario
+    Solution = apps.get_model('solutions', 'Solution')
+    Solution.objects.exclude(status='Pending').update(stats_applied=True)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('solutions', '0003_alter_solutiontestcaseresult_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='solution',
+            name='stats_applied',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.RunPython(mark_judged_as_applied, migrations.RunPython.noop),
+    ]
@@ -24,23 +24,41 @@ class Solution(models.Model):
     output = models.TextField(blank=True, null=True)
     time = models.FloatField(blank=True, null=True, default=0.0)
     memory = models.FloatField(blank=True, null=True, default=0.0)
+    stats_applied = models.BooleanField(default=False)  # Ya sumada a las estadísticas del usuario (ver users.tasks)
     
-    def trigger_evaluation(self):
+    def trigger_evaluation(self, policy=None):
         from .tasks import evaluate_solution
-        evaluate_solution.delay(self.id)
+        evaluate_solution.delay(self.id, policy)
 
     def __str__(self):
         return f"Solution {self.id} by {self.user.username} for {self.problem.title}"
 
 
 class SolutionTestCaseResult(models.Model):
+    # Estados por caso que produce el juez (ver solutions.tasks.grade_execution)
+    STATUS_CHOICES = [
+        ('Passed', 'Passed'),
+        ('Failed', 'Failed'),
+        ('Skipped', 'Skipped'),
+        ('Error', 'Error'),
+        ('Runtime Error', 'Runtime Error'),
+        ('Memory Limit Exceeded', 'Memory Limit Exceeded'),
+        ('Time Limit Exceeded', 'Time Limit Exceeded'),
+    ]
+
     solution = models.ForeignKey(Solution, on_delete=models.CASCADE, related_name='test_case_results')
     testcase = models.ForeignKey(TestCase, on_delete=models.CASCADE)
-    status = models.CharField(max_length=30, choices=Solution.STATUS_CHOICES)
+    status = models.CharField(max_length=30, choices=STATUS_CHOICES)
     output = models.TextField(blank=True, null=True)
-    expected_output = models.TextField()
+    expected_output = models.TextField(blank=True, null=True)
     time = models.FloatField(blank=True, null=True, default=0.0)
     memory = models.FloatField(blank=True, null=True, default=0.0)
 
+    class Meta:
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['solution', 'status']),
+        ]
+
     def __str__(self):
-        return f"TestCase {self.testcase.id} for Solution {self.solution.id}"
+        return f"TestCase {self.testcase_id} for Solution {self.solution_id}"
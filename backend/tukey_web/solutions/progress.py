@@ -0,0 +1,166 @@
+import logging
+import threading
+import time
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+
+from tukey_web.redis_client import get_async_redis, get_redis
+from .events import dumps, tag_frame
+from users.notifications import user_group_name
+
+logger = logging.getLogger(__name__)
+
+# Eventos acumulados que fuerzan un envío
+FLUSH_EVERY = getattr(settings, 'JUDGE_PROGRESS_FLUSH_EVERY', 10)
+# Tiempo máximo que un evento espera antes de enviarse (milisegundos)
+FLUSH_INTERVAL_MS = getattr(settings, 'JUDGE_PROGRESS_FLUSH_INTERVAL_MS', 200)
+# Tiempo que se conserva el progreso para reenviarlo a sockets que se conectan tarde (segundos)
+REPLAY_TTL = getattr(settings, 'JUDGE_PROGRESS_REPLAY_TTL', 300)
+# Eventos máximos guardados por solución
+REPLAY_MAXLEN = getattr(settings, 'JUDGE_PROGRESS_REPLAY_MAXLEN', 1000)
+
+
+def progress_stream_key(solution_id):
+    return f"solution_progress:{solution_id}"
+
+
+def stream_position(entry_id):
+    """Convierte un id de stream ("1700000000000-3") en una tupla comparable."""
+    milliseconds, sequence = entry_id.split('-')
+    return int(milliseconds), int(sequence)
+
+
+def append_progress(solution_id, frames):
+    """
+    Agrega los eventos ya serializados al stream de la solución y devuelve pares
+    (id, frame); con el id el consumer descarta los que ya reenvió. Si Redis falla,
+    los eventos se publican igual con id None, solo que sin posibilidad de reenvío.
+    """
+    key = progress_stream_key(solution_id)
+    try:
+        pipe = get_redis().pipeline(transaction=False)
+        for frame in frames:
+            pipe.xadd(key, {"frame": frame}, maxlen=REPLAY_MAXLEN, approximate=True)
+        pipe.expire(key, REPLAY_TTL)
+        *entry_ids, _ = pipe.execute()
+    except Exception:
+        logger.exception(f"No se pudo guardar el progreso de la solución {solution_id}")
+        return [(None, frame) for frame in frames]
+    return list(zip(entry_ids, frames))
+
+
+async def read_progress(solution_id):
+    """Pares (id, frame) guardados de la solución, en orden."""
+    client = get_async_redis()
+    try:
+        entries = await client.xrange(progress_stream_key(solution_id))
+    finally:
+        await client.aclose()
+    return [(entry_id, fields["frame"]) for entry_id, fields in entries]
+
+
+def is_replayed(entry_id, replayed_until):
+    """Indica si el evento ya se reenvió desde el stream al conectarse."""
+    return (
+        replayed_until is not None
+        and entry_id is not None
+        and stream_position(entry_id) <= replayed_until
+    )
+
+
+class ProgressPublisher:
+    """
+    Publica el progreso de una solución en el channel layer desde un hilo aparte.
+
+    Los eventos se agrupan y se envían en un solo mensaje cada `flush_every` eventos
+    o cada `flush_interval_ms`, más un envío final al cerrar; así el juez nunca
+    espera a Redis mientras califica. Cada lote también se guarda en un stream de
+    Redis para reenviarlo a los sockets que se conectan tarde (ver read_progress).
+    Con `user_id` el lote también llega al socket del usuario (ver users.consumers).
+    """
+
+    def __init__(self, solution_id, user_id=None, flush_every=FLUSH_EVERY, flush_interval_ms=FLUSH_INTERVAL_MS):
+        self.solution_id = solution_id
+        self.user_id = user_id
+        self.group_name = f"solution_{solution_id}"
+        self.flush_every = flush_every
+        self.flush_interval = flush_interval_ms / 1000
+        self._pending = []
+        self._closed = False
+        self._condition = threading.Condition()
+        self._thread = threading.Thread(
+            target=self._run, name=f"progress-{solution_id}", daemon=True
+        )
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+        return False
+
+    def publish(self, event):
+        """Encola un evento tipado (ver solutions.events); se serializa en el hilo publicador."""
+        with self._condition:
+            self._pending.append(event)
+            if len(self._pending) >= self.flush_every:
+                self._condition.notify()
+
+    def close(self):
+        """Envía lo pendiente y detiene el hilo."""
+        with self._condition:
+            if self._closed:
+                return
+            self._closed = True
+            self._condition.notify()
+        self._thread.join()
+
+    def _run(self):
+        channel_layer = get_channel_layer()
+        while True:
+            deadline = time.monotonic() + self.flush_interval
+            with self._condition:
+                while not self._closed and len(self._pending) < self.flush_every:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._condition.wait(remaining)
+                events, self._pending = self._pending, []
+                closed = self._closed
+
+            if events:
+                self._send(channel_layer, events)
+            if closed:
+                return
+
+    def _send(self, channel_layer, events):
+        # Cada evento se serializa una sola vez para todos los sockets del grupo
+        entries = append_progress(self.solution_id, [dumps(event.to_dict()) for event in events])
+        try:
+            async_to_sync(self._group_send)(channel_layer, entries)
+        except Exception:
+            logger.exception(f"No se pudo publicar el progreso de la solución {self.solution_id}")
+
+    async def _group_send(self, channel_layer, entries):
+        await channel_layer.group_send(
+            self.group_name,
+            {
+                "type": "send_solution_batch",
+                "entries": entries,
+            },
+        )
+        if self.user_id is not None:
+            await channel_layer.group_send(
+                user_group_name(self.user_id),
+                {
+                    "type": "user_solution_batch",
+                    "solution_id": self.solution_id,
+                    "entries": [
+                        (entry_id, tag_frame(frame, type="solution", solution_id=self.solution_id))
+                        for entry_id, frame in entries
+                    ],
+                },
+            )
@@ -0,0 +1,331 @@
+import logging
+import os
+import signal
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+
+import billiard
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Número de procesos sandbox que se mantienen listos por proceso worker
+POOL_SIZE = getattr(settings, 'JUDGE_SANDBOX_POOL_SIZE', 2)
+# Sandbox entre los que se reparten los casos de una misma solución (1 = secuencial);
+# cada problema lo puede cambiar con Problem.parallel_sandboxes
+PARALLEL_SANDBOXES = getattr(settings, 'JUDGE_PARALLEL_SANDBOXES', 1)
+# Margen sobre el límite de tiempo antes de que el padre mate al sandbox
+WALL_TIME_GRACE_SECONDS = getattr(settings, 'JUDGE_WALL_TIME_GRACE_SECONDS', 1)
+# Tiempo máximo para cargar el módulo de la solución (imports y código de nivel superior)
+LOAD_TIME_LIMIT_SECONDS = getattr(settings, 'JUDGE_LOAD_TIME_LIMIT_SECONDS', 5)
+
+# Módulo que el servidor de sandbox importa una sola vez (ver _get_context)
+SANDBOX_PRELOAD = 'solutions.sandbox_server'
+
+# Aviso del sandbox de que terminó de cargar la solución; los límites por caso corren desde aquí
+SANDBOX_LOADED = 'loaded'
+
+SANDBOX_CRASHED = {
+    "result": "Runtime Error: el proceso sandbox terminó inesperadamente",
+    "status": "Runtime Error",
+    "execution_time": None,
+    "peak_memory": None,
+    # Puede ser una falla del juez y no de la solución; el veredicto no se guarda en caché
+    "sandbox_crashed": True,
+}
+
+SANDBOX_TIMED_OUT = {
+    "result": "Time Limit Exceeded",
+    "status": "Time Limit Exceeded",
+    "execution_time": None,
+    "peak_memory": None,
+}
+
+
+def _get_context():
+    """
+    Los sandbox se crean desde un servidor (forkserver) con Django y el juez ya
+    importados, nunca forkeando el worker: sus hilos (progreso, clientes de Redis)
+    podrían tener candados tomados en ese momento. Se usa billiard, el multiprocessing
+    de Celery, que permite crear procesos desde los hijos daemon del pool prefork.
+    """
+    if 'forkserver' in billiard.get_all_start_methods():
+        ctx = billiard.get_context('forkserver')
+        ctx.set_forkserver_preload([SANDBOX_PRELOAD])
+        return ctx
+    return billiard.get_context('spawn')
+
+
+def start_sandbox_server():
+    """
+    Arranca el servidor de sandbox. El worker lo llama al iniciar, antes de crear su
+    pool, para que todos sus procesos compartan un mismo servidor.
+    """
+    ctx = _get_context()
+    if ctx.get_start_method() == 'forkserver':
+        from billiard import forkserver
+        forkserver.ensure_running()
+
+
+def _remaining(timeout, deadline):
+    """Acorta la espera `timeout` para no pasar de `deadline`."""
+    if deadline is None:
+        return timeout
+    remaining = max(0, deadline - time.monotonic())
+    return remaining if timeout is None else min(timeout, remaining)
+
+
+def _sandbox_main(conn):
+    """
+    Bucle principal del proceso sandbox.
+    Aplica los límites una sola vez al arrancar y ejecuta los trabajos que recibe por el Pipe.
+    """
+    from . import sandbox_server  # noqa: F401 (ya cargado en el servidor; con spawn configura Django)
+    from .measurement import set_rss_baseline
+    from .tasks import (
+        error_result,
+        install_time_limit_handlers,
+        limit_memory,
+        load_solution,
+        run_solution,
+    )
+
+    limit_memory()
+    install_time_limit_handlers()
+    set_rss_baseline()
+
+    while True:
+        try:
+            job = conn.recv()
+        except EOFError:
+            break
+        if job is None:
+            break
+
+        code, payload, measurement = job
+
+        # Los resultados del lote se envían uno por uno para que el padre pueda
+        # detectar el caso que excede el límite y matar solo a partir de ahí
+        try:
+            solution_func, func_params = load_solution(code)
+        except Exception as e:
+            conn.send(SANDBOX_LOADED)
+            for _ in payload:
+                conn.send(error_result(e))
+            continue
+        conn.send(SANDBOX_LOADED)
+        for input_data in payload:
+            conn.send(run_solution(solution_func, func_params, input_data, measurement))
+
+
+class SandboxProcess:
+    """Proceso hijo con límites aplicados que ejecuta soluciones enviadas por un Pipe."""
+
+    def __init__(self, ctx):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_sandbox_main, args=(child_conn,), daemon=True)
+        self.process.start()
+        child_conn.close()
+
+    def is_alive(self):
+        return self.process.is_alive()
+
+    def _receive(self, timeout):
+        """Espera un resultado; si vence el límite de reloj, mata al sandbox."""
+        if timeout is not None and not self.conn.poll(timeout):
+            self.terminate()
+            return SANDBOX_TIMED_OUT.copy()
+        return self.conn.recv()
+
+    def run(self, code, input_data, time_limit=None, measurement=None, deadline=None):
+        return next(self.stream_batch(code, [input_data], time_limit, measurement, deadline))
+
+    def stream_batch(self, code, inputs, time_limit=None, measurement=None, deadline=None):
+        """
+        Envía todos los casos en un solo viaje y produce los resultados conforme llegan.
+        Se detiene después del primer caso que mata al sandbox.
+
+        El límite de cada caso corre desde que el sandbox terminó de cargar la solución;
+        la carga tiene su propio límite. Ninguna espera pasa de `deadline` (time.monotonic()).
+        """
+        try:
+            self.conn.send((code, inputs, measurement))
+            if self._receive(_remaining(LOAD_TIME_LIMIT_SECONDS, deadline)) != SANDBOX_LOADED:
+                # La carga no terminó a tiempo: ningún caso llega a ejecutarse
+                for _ in inputs:
+                    yield SANDBOX_TIMED_OUT.copy()
+                return
+            timeout = self._wall_timeout(time_limit)
+            for _ in inputs:
+                result = self._receive(_remaining(timeout, deadline))
+                yield result
+                if not self.is_alive():
+                    return
+        except (EOFError, BrokenPipeError, ConnectionResetError):
+            self.terminate()
+            yield SANDBOX_CRASHED.copy()
+
+    @staticmethod
+    def _wall_timeout(time_limit):
+        if time_limit is None:
+            return None
+        return time_limit + WALL_TIME_GRACE_SECONDS
+
+    def terminate(self):
+        if self.process.is_alive():
+            # SIGKILL: el código del usuario puede ignorar SIGTERM
+            try:
+                os.kill(self.process.pid, getattr(signal, 'SIGKILL', signal.SIGTERM))
+            except ProcessLookupError:
+                pass
+        try:
+            self.conn.close()
+        except OSError:
+            pass
+        self.process.join(timeout=1)
+
+
+class SandboxLease:
+    """Préstamo de un proceso sandbox; reemplaza el proceso si muere entre ejecuciones."""
+
+    def __init__(self, pool, sandbox):
+        self.pool = pool
+        self.sandbox = sandbox
+
+    def _ensure_alive(self):
+        if not self.sandbox.is_alive():
+            self.sandbox.terminate()
+            self.sandbox = self.pool.acquire()
+
+    def run(self, code, input_data, time_limit=None, measurement=None, deadline=None):
+        self._ensure_alive()
+        return self.sandbox.run(code, input_data, time_limit, measurement, deadline)
+
+    def run_batch(self, code, inputs, time_limit=None, stop_when=None, measurement=None, deadline=None):
+        """
+        Ejecuta el lote completo. Si el sandbox es terminado a mitad del lote,
+        los casos restantes continúan en un proceso nuevo, salvo que ya se haya
+        pasado `deadline`.
+        `stop_when(index, result)` recibe cada resultado en cuanto llega; si devuelve
+        True se detiene el lote. En ambos casos los casos que no se ejecutaron quedan
+        como None.
+        """
+        results = []
+        while len(results) < len(inputs):
+            if deadline is not None and results and time.monotonic() >= deadline:
+                return results + [None] * (len(inputs) - len(results))
+            self._ensure_alive()
+            for result in self.sandbox.stream_batch(code, inputs[len(results):], time_limit, measurement, deadline):
+                results.append(result)
+                if stop_when and stop_when(len(results) - 1, result):
+                    self.sandbox.terminate()
+                    return results + [None] * (len(inputs) - len(results))
+        return results
+
+
+class SandboxPool:
+    """
+    Pool de procesos sandbox pre-forkeados.
+    Cada préstamo recibe un proceso limpio; al devolverlo se descarta y se repone otro,
+    así el código de un usuario nunca comparte proceso con el de otra solución.
+    """
+
+    def __init__(self, size=POOL_SIZE):
+        self.size = size
+        self.pid = os.getpid()
+        self._ctx = _get_context()
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self.fill()
+
+    def fill(self):
+        with self._lock:
+            while len(self._idle) < self.size:
+                self._idle.append(SandboxProcess(self._ctx))
+
+    def acquire(self):
+        with self._lock:
+            while self._idle:
+                sandbox = self._idle.popleft()
+                if sandbox.is_alive():
+                    return sandbox
+                sandbox.terminate()
+        logger.debug("Pool de sandbox vacío, creando un proceso nuevo")
+        return SandboxProcess(self._ctx)
+
+    @contextmanager
+    def lease(self):
+        lease = SandboxLease(self, self.acquire())
+        try:
+            yield lease
+        finally:
+            lease.sandbox.terminate()
+            self.fill()
+
+    @contextmanager
+    def lease_many(self, count):
+        """Presta varios sandbox a la vez; se crean en el hilo actual antes de repartir el trabajo."""
+        leases = [SandboxLease(self, self.acquire()) for _ in range(count)]
+        try:
+            yield leases
+        finally:
+            for lease in leases:
+                lease.sandbox.terminate()
+            self.fill()
+
+    def run_parallel(self, code, inputs, time_limit=None, workers=PARALLEL_SANDBOXES, stop_when=None,
+                     measurement=None, budget=None):
+        """
+        Reparte los casos de una solución entre varios sandbox y devuelve los resultados
+        en el orden original. Los casos se asignan de forma intercalada para que los casos
+        pesados, que suelen ir juntos, no caigan todos en el mismo sandbox.
+        `stop_when` se llama desde el hilo de cada sandbox conforme llegan los resultados;
+        el primer sandbox que se detiene detiene también a los demás.
+        Con `budget` (segundos) el lote completo tiene un tiempo máximo: el caso en curso
+        al vencer termina como límite de tiempo y los siguientes quedan como None.
+        """
+        deadline = time.monotonic() + budget if budget is not None else None
+        workers = max(1, min(workers, len(inputs)))
+        if workers == 1:
+            with self.lease() as lease:
+                return lease.run_batch(code, inputs, time_limit, stop_when, measurement, deadline)
+
+        chunks = [list(range(start, len(inputs), workers)) for start in range(workers)]
+        results = [None] * len(inputs)
+        stopped = threading.Event()
+
+        def run_chunk(lease, indexes):
+            def chunk_stop(position, result):
+                if stop_when(indexes[position], result):
+                    stopped.set()
+                return stopped.is_set()
+
+            chunk_inputs = [inputs[i] for i in indexes]
+            chunk_stop_when = chunk_stop if stop_when else None
+            return indexes, lease.run_batch(code, chunk_inputs, time_limit, chunk_stop_when, measurement, deadline)
+
+        with self.lease_many(workers) as leases:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                for indexes, chunk_results in executor.map(run_chunk, leases, chunks):
+                    for index, result in zip(indexes, chunk_results):
+                        results[index] = result
+        return results
+
+    def shutdown(self):
+        with self._lock:
+            while self._idle:
+                self._idle.popleft().terminate()
+
+
+_pool = None
+
+
+def get_sandbox_pool():
+    """Devuelve el pool del proceso actual, creándolo de nuevo si el proceso fue forkeado."""
+    global _pool
+    if _pool is None or _pool.pid != os.getpid():
+        _pool = SandboxPool()
+    return _pool
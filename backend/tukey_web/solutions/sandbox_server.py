@@ -0,0 +1,9 @@
+"""
+Precarga del servidor de sandbox (ver solutions.sandbox): configura Django e importa el
+juez una sola vez, así cada sandbox nace de un proceso ya cargado y sin hilos.
+"""
+import django
+
+django.setup()
+
+from . import tasks  # noqa: E402,F401
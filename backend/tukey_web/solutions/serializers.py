@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Solution
+from .models import Solution, SolutionTestCaseResult
 
 class SolutionSerializer(serializers.ModelSerializer):
     problem_title = serializers.CharField(source='problem.title', read_only=True)
@@ -7,3 +7,9 @@ class SolutionSerializer(serializers.ModelSerializer):
     class Meta:
         model = Solution
         fields = ['id', 'problem_title', 'language', 'status', 'created_at', 'time', 'memory']
+
+
+class SolutionTestCaseResultSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = SolutionTestCaseResult
+        fields = ['id', 'testcase', 'status', 'output', 'expected_output', 'time', 'memory']
@@ -1,63 +1,40 @@
-import importlib.util
-import os
 import json
 import logging
-import time
-import tracemalloc
 import signal  # Necesario para manejar el límite de tiempo
-from celery import shared_task
-from .models import Solution, TestCase
-import ast
+from celery import chord, shared_task
+from django.conf import settings
+from django.db import transaction
+from .models import Solution, SolutionTestCaseResult, TestCase
 import platform
 import psutil
-import threading
-from channels.layers import get_channel_layer
-from asgiref.sync import async_to_sync
 from typing import Union
 import inspect  # Para validar la firma de la función
+import types
+import uuid
+from .bundles import bundle_case, get_test_bundle
+from .measurement import get_meter
+from .events import CompletedEvent, TestCaseEvent
+from .progress import ProgressPublisher
+from users.tasks import schedule_user_stats
+from .sandbox import PARALLEL_SANDBOXES, get_sandbox_pool
+from testcases.comparators import OutputComparator, to_jsonable
+from .verdict_cache import get_cached_verdict, store_verdict, verdict_key
 
 logger = logging.getLogger(__name__)
 
 # Configuración de límites
 TIME_LIMIT_SECONDS = 2  # Tiempo límite en segundos
 MEMORY_LIMIT_MB = 50    # Límite de memoria en MB
+# Tiempo máximo para todos los casos de una solución; debe quedar bajo el task_soft_time_limit de Celery
+SUBMISSION_TIME_BUDGET_SECONDS = getattr(settings, 'JUDGE_SUBMISSION_TIME_BUDGET', 20)
+# Tiempo máximo para los casos de una ejecución de prueba ("Run"), que el usuario espera en línea
+RUN_TIME_BUDGET_SECONDS = getattr(settings, 'JUDGE_RUN_TIME_BUDGET', 10)
 
-def parse_input(input_str):
-    """
-    Parsea entradas flexiblemente
-    Soporta JSON, literales de Python, y cadenas simples
-    """
-    print(f"Input recibido: {input_str}")
-    print(f"Tipo de input: {type(input_str)}")
-    
-    # Si input_str es una lista, conviértelo a JSON
-    if isinstance(input_str, list):
-        input_str = json.dumps(input_str)
-    
-    input_str = str(input_str).strip()
-    
-    print(f"Input después de strip: '{input_str}'")
-    
-    try:
-        # Primero intenta parsear como JSON
-        return json.loads(input_str)
-    except json.JSONDecodeError as e:
-        print(f"JSON Decode Error: {e}")
-        # Si falla, intenta como literal de Python
-        try:
-            return ast.literal_eval(input_str)
-        except (SyntaxError, ValueError) as e:   
-            print(f"Literal Eval Error: {e}")
-            # Si falla, intenta separar por comas
-            try:
-                return [x.strip() for x in input_str.split(',')]
-            except Exception as e:
-                print(f"Final parsing Error: {e}")
-                raise ValueError(f"No se pudo parsear la entrada: {input_str}")
-            
 def limit_memory():
     """
     Configura el límite de memoria dependiendo del sistema operativo.
+    Se llama dentro del proceso sandbox, por lo que el límite se suma a la memoria
+    que el proceso ya tenía reservada al forkearse.
     """
     if platform.system() == "Windows":
         # En Windows no se puede usar `resource` directamente
@@ -65,82 +42,93 @@ def limit_memory():
     else:
         # En Unix (Linux/macOS), usar `resource` para establecer límites
         import resource
-        soft, hard = MEMORY_LIMIT_MB * 1024 * 1024, MEMORY_LIMIT_MB * 1024 * 1024
+        baseline = psutil.Process().memory_info().vms
+        soft = hard = baseline + MEMORY_LIMIT_MB * 1024 * 1024
         resource.setrlimit(resource.RLIMIT_AS, (soft, hard))
 
-def timeout_monitor(pid, time_limit):
-    """Monitorea el tiempo de ejecución y verifica si el proceso excede el límite."""
-    start_time = time.time()  # Registrar el tiempo de inicio
-    process = psutil.Process(pid)  # Obtener el proceso actual
-
-    while True:
-        elapsed_time = time.time() - start_time  # Calcular el tiempo transcurrido
-        if elapsed_time > time_limit:  # Verificar si el tiempo límite ha sido excedido
-            try:
-                if process.is_running():
-                    print(f"Límite de tiempo excedido: {time_limit} segundos. El proceso sigue corriendo.")
-                    # Aquí puedes decidir si terminas el proceso o simplemente registras un mensaje.
-                    break  # Sal del monitoreo, pero no termines el proceso.
-            except psutil.NoSuchProcess:
-                print("El proceso principal ya ha terminado.")
-                break
-        time.sleep(0.1)  # Revisar cada 100ms
+def _raise_time_limit(signum, frame):
+    raise TimeoutError("Time Limit Exceeded")
 
-def limit_time():
-    """Inicia un hilo para monitorear el tiempo límite."""
-    pid = os.getpid()
-    monitor_thread = threading.Thread(target=timeout_monitor, args=(pid, TIME_LIMIT_SECONDS))
-    monitor_thread.daemon = True  # Finaliza el hilo cuando el programa principal termina
-    monitor_thread.start()
-
-def are_floats_equal(expected, actual, tolerance=1e-6):
+def install_time_limit_handlers():
     """
-    Compara dos listas de números flotantes permitiendo una tolerancia.
+    Convierte SIGALRM (tiempo de reloj) y SIGXCPU (tiempo de CPU) en TimeoutError.
+    Se llama una sola vez dentro del proceso sandbox.
     """
-    if len(expected) != len(actual):
-        return False
-    return all(abs(e - a) <= tolerance for e, a in zip(expected, actual))
+    if platform.system() == "Windows":
+        logger.warning("Límite de tiempo por señales no soportado en Windows. El juez solo usa el límite de reloj.")
+        return
+    signal.signal(signal.SIGALRM, _raise_time_limit)
+    signal.signal(signal.SIGXCPU, _raise_time_limit)
 
-def execute_solution(solution_code: str, input_data: Union[dict, list, tuple]):
+def limit_time():
     """
-    Ejecuta dinámicamente la solución con límites de tiempo y memoria.
+    Arma los límites de tiempo de CPU y de reloj para el siguiente caso de prueba.
+    Si la solución los ignora (por ejemplo, capturando la excepción), el proceso padre
+    termina el sandbox al vencer el límite de reloj.
     """
-    temp_dir = f'/tmp/solution_execution'
-    os.makedirs(temp_dir, exist_ok=True)
-    solution_path = os.path.join(temp_dir, 'solution.py')
+    if platform.system() == "Windows":
+        return
+    import resource
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    cpu_used = usage.ru_utime + usage.ru_stime
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (int(cpu_used + TIME_LIMIT_SECONDS) + 1, hard))
+    signal.setitimer(signal.ITIMER_REAL, TIME_LIMIT_SECONDS)
+
+def clear_time_limit():
+    """Desarma la alarma de reloj al terminar el caso de prueba."""
+    if platform.system() == "Windows":
+        return
+    signal.setitimer(signal.ITIMER_REAL, 0)
+
+def error_result(exc):
+    """Convierte una excepción de la solución en el resultado que reporta el juez."""
+    if isinstance(exc, TimeoutError):
+        return {"result": "Time Limit Exceeded", "status": "Time Limit Exceeded",
+                "execution_time": None, "peak_memory": None}
+    if isinstance(exc, MemoryError):
+        return {"result": "Memory Limit Exceeded", "status": "Memory Limit Exceeded",
+                "execution_time": None, "peak_memory": None}
+    return {"result": f"Runtime Error: {str(exc)}", "status": "Runtime Error",
+            "execution_time": None, "peak_memory": None}
+
+def load_solution(solution_code: str):
+    """
+    Carga el código de la solución y devuelve la función principal junto con sus parámetros.
+    El código se compila en memoria con un nombre de archivo virtual único, así varios
+    procesos del juez pueden cargar soluciones a la vez sin compartir archivos en disco.
+    """
+    filename = f"<solution-{uuid.uuid4().hex}>"
+    module = types.ModuleType("solution")
+    module.__file__ = filename
 
-    try:
-        # Escribir código de solución
-        solution_code = "# -*- coding: utf-8 -*-\n" + solution_code
-        with open(solution_path, 'w', encoding='utf-8') as f:
-            f.write(solution_code)
-
-        # Importar módulo dinámicamente
-        spec = importlib.util.spec_from_file_location("solution", solution_path)
-        module = importlib.util.module_from_spec(spec)
-        spec.loader.exec_module(module)
-
-        # Configurar límites de tiempo y memoria
-        limit_memory()
-        limit_time()
+    code_object = compile(solution_code, filename, 'exec')
+    exec(code_object, module.__dict__)
 
-        # Iniciar medición de tiempo y memoria
-        tracemalloc.start()
-        start_time = time.perf_counter()
+    # Encontrar función principal
+    solution_func = None
+    for name, func in module.__dict__.items():
+        if callable(func) and name != '__builtins__':
+            solution_func = func
+            break
 
-        # Encontrar función principal
-        solution_func = None
-        for name, func in module.__dict__.items():
-            if callable(func) and name != '__builtins__':
-                solution_func = func
-                break
+    if not solution_func:
+        raise ValueError("No se encontró función en la solución")
 
-        if not solution_func:
-            raise ValueError("No se encontró función en la solución")
+    # Validar la firma de la función
+    signature = inspect.signature(solution_func)
+    func_params = list(signature.parameters.keys())
 
-        # Validar la firma de la función
-        signature = inspect.signature(solution_func)
-        func_params = list(signature.parameters.keys())
+    return solution_func, func_params
+
+def run_solution(solution_func, func_params, input_data: Union[dict, list, tuple], measurement=None):
+    """
+    Ejecuta la función ya cargada con un caso de prueba, midiendo tiempo y memoria
+    con el backend de medición indicado (ver solutions.measurement).
+    """
+    try:
+        # Configurar límite de tiempo (el de memoria ya lo aplica el proceso sandbox)
+        limit_time()
 
         # Ajustar el formato de input_data según sea necesario
         if isinstance(input_data, (list, tuple)):
@@ -161,18 +149,11 @@ def execute_solution(solution_code: str, input_data: Union[dict, list, tuple]):
             # Si es un valor simple, conviértelo en una lista de un elemento
             input_args = [input_data]
 
-        # Ejecutar la función con los argumentos procesados
-        result = solution_func(*input_args)
-
-        # Detener medición de tiempo y memoria
-        end_time = time.perf_counter()
-        current, peak = tracemalloc.get_traced_memory()
-        tracemalloc.stop()
+        # Ejecutar la función con los argumentos procesados, midiendo tiempo y memoria
+        with get_meter(measurement) as meter:
+            result = solution_func(*input_args)
 
-        execution_time = end_time - start_time
-        peak_memory = peak / (1024 * 1024)
-
-        if execution_time > TIME_LIMIT_SECONDS:
+        if meter.execution_time > TIME_LIMIT_SECONDS:
             raise TimeoutError("Time Limit Exceeded")
 
         # Asegurar que el resultado sea serializable
@@ -183,109 +164,275 @@ def execute_solution(solution_code: str, input_data: Union[dict, list, tuple]):
 
         return {
             "result": result,
-            "execution_time": execution_time,
-            "peak_memory": peak_memory
+            "execution_time": meter.execution_time,
+            "peak_memory": meter.peak_memory
         }
 
-    except TimeoutError:
-        return {"result": "Time Limit Exceeded", "execution_time": None, "peak_memory": None}
-    except MemoryError:
-        return {"result": "Memory Limit Exceeded", "execution_time": None, "peak_memory": None}
     except Exception as e:
-        return {"result": f"Runtime Error: {str(e)}", "execution_time": None, "peak_memory": None}
+        return error_result(e)
     finally:
-        try:
-            os.remove(solution_path)
-        except Exception as cleanup_error:
-            logger.error(f"Error limpiando el archivo temporal: {cleanup_error}")
-            
-            
-def notify_solution(solution_id, status, output):
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"solution_{solution_id}",
-        {
-            "type": "send_solution_update",
-            "status": status,
-            "output": output,
+        clear_time_limit()
+
+def grade_execution(testcase, execution, comparator):
+    """
+    Compara la ejecución de un caso de prueba (ya empaquetado, ver solutions.bundles)
+    con la salida esperada y arma su resultado.
+    """
+    try:
+        if testcase.error is not None:
+            return {
+                'testcase_id': testcase.id,
+                'status': 'Error',
+                'output': testcase.error,
+                'execution_time': None,
+                'peak_memory': None
+            }
+
+        result = execution["result"]
+
+        # Límite de tiempo, de memoria o error en tiempo de ejecución
+        if execution.get("status"):
+            graded = {
+                'testcase_id': testcase.id,
+                'status': execution["status"],
+                'output': result,
+                'execution_time': None,
+                'peak_memory': None
+            }
+            if execution.get("sandbox_crashed"):
+                graded['sandbox_crashed'] = True
+            return graded
+
+        # Asegurar que result también sea una lista
+        if isinstance(result, (int, float)):
+            result = [result]
+        elif isinstance(result, tuple):
+            result = list(result)
+
+        if testcase.as_text:
+            # Salida esperada en texto libre: se compara con la salida como texto
+            actual_text = result.strip() if isinstance(result, str) else json.dumps(to_jsonable(result))
+            passed = actual_text == testcase.expected
+        else:
+            # Comparar con el comparador configurado en el problema
+            passed = comparator.compare(testcase.expected, result)
+
+        return {
+            'testcase_id': testcase.id,
+            'status': 'Passed' if passed else 'Failed',
+            'output': json.dumps(to_jsonable(result)),
+            'expected': json.dumps(testcase.expected),
+            'execution_time': execution["execution_time"],
+            'peak_memory': execution["peak_memory"]
+        }
+    except Exception as e:
+        return {
+            'testcase_id': testcase.id,
+            'status': 'Error',
+            'output': str(e),
+            'execution_time': None,
+            'peak_memory': None
         }
-    )
 
-def notify_user(user_id, status, output):
-    # Lógica para enviar una notificación al usuario
-    print(f"Notifying user {user_id} with status {status} and output: {output}")
-
-def send_feedback(solution_id, testcase_index, total_testcases, status, message):
-    """Función para enviar actualizaciones de progreso."""
-    channel_layer = get_channel_layer()
-    async_to_sync(channel_layer.group_send)(
-        f"solution_{solution_id}",  # Grupo del WebSocket
-        {
-            "type": "send_solution_update",
-            "status": status,
-            "message": f"Test case {testcase_index}/{total_testcases}: {message}",
-        },
+def send_result_feedback(progress, index, total_testcases, result, testcase):
+    """Publica el progreso de un caso de prueba ya calificado."""
+    progress.publish(TestCaseEvent.from_result(index, total_testcases, result, testcase))
+
+def sandbox_workers(problem):
+    """Sandbox entre los que se reparten los casos del problema (ver Problem.parallel_sandboxes)."""
+    return problem.parallel_sandboxes or PARALLEL_SANDBOXES
+
+def judge_testcases(solution, testcases, policy, comparator, progress, measurement=None,
+                    workers=PARALLEL_SANDBOXES):
+    """
+    Ejecuta la solución contra los casos de prueba y califica cada uno,
+    publicando el progreso con `progress` (ver solutions.progress).
+    `measurement` elige el backend de medición (ver solutions.measurement) y
+    `workers` cuántos sandbox se reparten los casos.
+    Devuelve los resultados por caso, el tiempo total y la memoria máxima.
+    """
+    total_testcases = len(testcases)
+    results = []
+    total_time = 0
+    total_memory = 0
+
+    # Las entradas ya vienen parseadas en el paquete de pruebas
+    inputs = [testcase.parsed_input for testcase in testcases]
+
+    # Cada caso se califica y se publica en cuanto el sandbox devuelve su resultado.
+    # Con "fail fast" el lote se detiene en el primer caso que no pasa y los siguientes
+    # quedan como omitidos; con el reporte completo cada caso tiene su propio veredicto
+    graded = {}
+
+    def stop_when(index, execution):
+        result = grade_execution(testcases[index], execution, comparator)
+        graded[index] = result
+        send_result_feedback(progress, index, total_testcases, result, testcases[index])
+        return policy == 'fail_fast' and result['status'] != 'Passed'
+
+    # La solución se carga una sola vez por sandbox y los casos viajan en lote;
+    # con `workers` > 1 el lote se reparte entre varios sandbox.
+    # El presupuesto total evita que la tarea llegue al límite de Celery y pierda los resultados
+    executions = get_sandbox_pool().run_parallel(
+        solution.code, inputs, time_limit=TIME_LIMIT_SECONDS, workers=workers, stop_when=stop_when,
+        measurement=measurement, budget=SUBMISSION_TIME_BUDGET_SECONDS,
     )
 
-async def execute_test_case(channel_layer, solution_id, test_case, test_number, total_tests):
-    try:
-        # Tu lógica de ejecución actual...
-        
-        # Formatear el resultado usando el método del modelo TestCase
-        test_result = test_case.format_test_result(
-            actual_output=output,
-            execution_time=execution_time,
-            peak_memory=peak_memory
-        )
+    for i, (testcase, execution) in enumerate(zip(testcases, executions)):
+        if execution is None:
+            # Caso omitido por la política "fail fast" o por agotar el presupuesto de tiempo
+            result = {
+                'testcase_id': testcase.id,
+                'status': 'Skipped',
+                'output': None,
+                'execution_time': None,
+                'peak_memory': None
+            }
+            send_result_feedback(progress, i, total_testcases, result, testcase)
+        else:
+            result = graded[i]
+            total_time += result['execution_time'] or 0
+            total_memory = max(total_memory, result['peak_memory'] or 0)
 
-        # Enviar resultado detallado
-        await channel_layer.group_send(
-            f"solution_{solution_id}",
-            {
-                "type": "send_solution_update",
-                "status": "Running",
-                "message": f"Test case {test_number}/{total_tests}: {'Passed' if test_result['status'] == 'Passed' else 'Failed'}",
-                "test_case_result": {
-                    "test_case_number": test_number,
-                    "total_test_cases": total_tests,
-                    **test_result
-                }
+        results.append(result)
+
+    return results, total_time, total_memory
+
+def run_cases(code, cases, comparator, budget=SUBMISSION_TIME_BUDGET_SECONDS, measurement=None,
+              workers=PARALLEL_SANDBOXES):
+    """
+    Ejecuta la solución contra casos visibles, ejemplos o entradas propias, sin
+    escribir en la base de datos ni actualizar estadísticas.
+    Los casos sin salida esperada solo reportan la salida obtenida.
+    """
+    inputs = [case.parsed_input for case in cases]
+    executions = get_sandbox_pool().run_parallel(
+        code, inputs, time_limit=TIME_LIMIT_SECONDS, workers=workers, measurement=measurement, budget=budget
+    )
+
+    results = []
+    for case, execution in zip(cases, executions):
+        if execution is None:
+            # Caso que no alcanzó a ejecutarse dentro del presupuesto de tiempo
+            result = {
+                'testcase_id': case.id,
+                'status': 'Skipped',
+                'output': None,
+                'execution_time': None,
+                'peak_memory': None
             }
+        elif case.expected_output is None and case.error is None:
+            failed = execution.get("status")
+            result = {
+                'testcase_id': case.id,
+                'status': failed or 'Executed',
+                'output': execution["result"] if failed else json.dumps(to_jsonable(execution["result"])),
+                'execution_time': execution["execution_time"],
+                'peak_memory': execution["peak_memory"]
+            }
+        else:
+            result = grade_execution(case, execution, comparator)
+        result['input'] = case.input
+        results.append(result)
+    return results
+
+@shared_task(bind=True)
+def run_visible_cases(self, code, problem_id, custom_input=None, user_id=None):
+    """
+    Ejecución de prueba ("Run") contra una entrada propia, los casos visibles o los
+    ejemplos, en ese orden. Corre en la cola "run" para que el código del usuario
+    nunca se ejecute en el proceso web. Devuelve None si no hay con qué probar.
+    Con `user_id` el resultado también se envía al socket del usuario.
+    """
+    from problems.models import Example, Problem
+    from users.notifications import send_user_event
+
+    problem = Problem.objects.get(id=problem_id)
+    if custom_input not in (None, ''):
+        source = 'custom'
+        cases = [bundle_case(None, custom_input, None)]
+    else:
+        # Los casos visibles salen del paquete de pruebas ya parseado y en caché
+        source = 'testcases'
+        cases = [case for case in get_test_bundle(problem.id).cases if case.visibility]
+        if not cases:
+            source = 'examples'
+            # Los ejemplos se escriben para leerse; si la salida no es JSON se compara como texto
+            cases = [
+                bundle_case(example.id, example.input_data, example.output_data, text_fallback=True)
+                for example in Example.objects.filter(problem=problem)
+            ]
+    if not cases:
+        run = None
+    else:
+        results = run_cases(
+            code, cases, OutputComparator.for_problem(problem),
+            budget=RUN_TIME_BUDGET_SECONDS, measurement=problem.measurement or None,
+            workers=sandbox_workers(problem),
         )
+        run = {
+            'source': source,
+            'status': results[0]['status'] if source == 'custom' else final_status(results),
+            'results': results,
+        }
 
-        # Si es el último test, enviar resultado final
-        if test_number == total_tests:
-            await channel_layer.group_send(
-                f"solution_{solution_id}",
-                {
-                    "type": "send_solution_update",
-                    "status": "Completed",
-                    "message": "Solution Accepted" if all_tests_passed else "Solution Failed",
-                    "test_case_result": {
-                        "final_status": "Accepted" if all_tests_passed else "Failed",
-                        "total_execution_time": total_time,
-                        "max_memory_used": max_memory
-                    }
-                }
-            )
+    if user_id is not None:
+        send_user_event(user_id, 'run', {'run_id': self.request.id, 'run': run})
+    return run
 
-    except Exception as e:
-        # Enviar error
-        await channel_layer.group_send(
-            f"solution_{solution_id}",
-            {
-                "type": "send_solution_update",
-                "status": "Error",
-                "message": str(e),
-                "test_case_result": {
-                    "status": "Error",
-                    "error_message": str(e)
-                }
-            }
+def final_status(results):
+    """
+    Calcula el veredicto de la solución a partir de los resultados por caso.
+    El primer caso que no pasa decide el veredicto cuando fue por límite o error de ejecución.
+    """
+    for r in results:
+        if r['status'] == 'Passed':
+            continue
+        if r['status'] in ('Time Limit Exceeded', 'Memory Limit Exceeded', 'Runtime Error'):
+            return r['status']
+        return 'Wrong Answer'
+    return 'Accepted'
+
+def results_summary(results):
+    """Resumen corto del veredicto; el detalle por caso vive en SolutionTestCaseResult."""
+    passed = sum(1 for r in results if r['status'] == 'Passed')
+    return f"{passed}/{len(results)} test cases passed"
+
+def save_testcase_results(solution, results):
+    """Reemplaza los resultados por caso de la solución con un solo INSERT."""
+    solution.test_case_results.all().delete()
+    SolutionTestCaseResult.objects.bulk_create([
+        SolutionTestCaseResult(
+            solution=solution,
+            testcase_id=r['testcase_id'],
+            status=r['status'],
+            output=r['output'],
+            expected_output=r.get('expected'),
+            time=r['execution_time'],
+            memory=r['peak_memory'],
         )
+        for r in results
+    ])
+
+def notify_solution(solution_id, status, output):
+    """Publica un veredicto que no pasó por los casos de prueba (p. ej. código vacío)."""
+    with ProgressPublisher(solution_id) as progress:
+        progress.publish(CompletedEvent(status, 0, detail=output))
+
+def notify_user(user_id, status, output):
+    """
+    Registra el veredicto enviado al usuario. Las estadísticas y el ranking le llegan
+    después, desde la etapa de users.tasks.
+    """
+    logger.info(f"Notifying user {user_id} with status {status} and output: {output}")
 
 @shared_task(bind=True, max_retries=3, default_retry_delay=5)
-def evaluate_solution(self, solution_id):
+def evaluate_solution(self, solution_id, policy=None, use_cache=True):
+    """
+    Califica la solución. Con `use_cache=False` no se reutiliza un veredicto en caché
+    (por ejemplo al reevaluar tras cambiar el juez o el comparador) y el veredicto
+    nuevo reemplaza al guardado.
+    """
     try:
         from solutions.models import Solution
         solution = Solution.objects.select_related("user", "problem").get(id=solution_id)
@@ -294,127 +441,65 @@ def evaluate_solution(self, solution_id):
             solution.status = "Compilation Error"
             solution.output = "Código vacío"
             solution.save()
-            solution.user.actualizar_estadisticas()
+            schedule_user_stats(solution.user_id, solution.id)
 
             # Notificar al usuario
             notify_solution(solution.id, solution.status, solution.output)
             return
 
-        testcases = solution.problem.testcases.all()
-        if not testcases.exists():
+        testcases = get_test_bundle(solution.problem_id).cases
+        if not testcases:
             solution.status = "Error"
             solution.output = "Sin casos de prueba"
             solution.save()
-            solution.user.actualizar_estadisticas()
+            schedule_user_stats(solution.user_id, solution.id)
 
             # Notificar al usuario
             notify_user(solution.user.id, solution.status, solution.output)
             return
 
         total_testcases = len(testcases)
-        results = []
-        total_time = 0
-        total_memory = 0
-
-        for i, testcase in enumerate(testcases):
-            try:
-                input_data = parse_input(testcase.input)
-                execution = execute_solution(solution.code, input_data)
-                result = execution["result"]
-                execution_time = execution["execution_time"]
-                peak_memory = execution["peak_memory"]
-
-                total_time += execution_time or 0
-                total_memory = max(total_memory, peak_memory or 0)
-
-                # Asegurar que expected_output sea una lista de números
-                try:
-                    if isinstance(testcase.expected_output, str):
-                        expected_output = json.loads(testcase.expected_output)
-                    else:
-                        expected_output = testcase.expected_output
-
-                    if isinstance(expected_output, (int, float)):
-                        expected_output = [expected_output]
-                    elif isinstance(expected_output, tuple):
-                        expected_output = list(expected_output)
-
-                    # Asegurar que result también sea una lista
-                    if isinstance(result, (int, float)):
-                        result = [result]
-                    elif isinstance(result, tuple):
-                        result = list(result)
-
-                    # Comparar con tolerancia
-                    passed = are_floats_equal(expected_output, result)
-
-                    results.append({
-                        'testcase_id': testcase.id,
-                        'status': 'Passed' if passed else 'Failed',
-                        'output': json.dumps(result),
-                        'expected': json.dumps(expected_output),
-                        'execution_time': execution_time,
-                        'peak_memory': peak_memory
-                    })
-                except json.JSONDecodeError as je:
-                    results.append({
-                        'testcase_id': testcase.id,
-                        'status': 'Error',
-                        'output': f'Error en formato de salida: {str(je)}',
-                        'execution_time': None,
-                        'peak_memory': None
-                    })
-
-                send_feedback(
-                    solution_id,
-                    i + 1,
-                    total_testcases,
-                    "Running",
-                    f"Test case {i + 1}/{total_testcases}: {'Passed' if passed else 'Failed'}"
-                )
-            except Exception as e:
-                results.append({
-                    'testcase_id': testcase.id,
-                    'status': 'Error',
-                    'output': str(e),
-                    'execution_time': None,
-                    'peak_memory': None
-                })
-                send_feedback(
-                    solution_id,
-                    i + 1,
-                    total_testcases,
-                    "Error",
-                    f"Test case {i + 1}/{total_testcases}: Error: {str(e)}"
+        policy = policy or solution.problem.judge_policy
+
+        # Código equivalente ya evaluado contra los mismos casos de prueba
+        comparator = OutputComparator.for_problem(solution.problem)
+        measurement = solution.problem.measurement or None
+        cache_key = verdict_key(solution.problem_id, solution.code, testcases, policy, comparator, measurement)
+        cached = get_cached_verdict(cache_key) if use_cache else None
+
+        # El progreso se agrupa y se publica desde un hilo aparte (ver solutions.progress);
+        # al salir del bloque se envía lo pendiente
+        with ProgressPublisher(solution_id, user_id=solution.user_id) as progress:
+            if cached is not None:
+                logger.info(f"Veredicto en caché para la solución {solution_id}: {cached['status']}")
+                results = cached["results"]
+                total_time = cached["time"]
+                total_memory = cached["memory"]
+                for i, (testcase, result) in enumerate(zip(testcases, results)):
+                    send_result_feedback(progress, i, total_testcases, result, testcase)
+            else:
+                results, total_time, total_memory = judge_testcases(
+                    solution, testcases, policy, comparator, progress, measurement,
+                    workers=sandbox_workers(solution.problem),
                 )
 
-        # Determinar el estado final
-        solution.status = 'Accepted' if all(r['status'] == 'Passed' for r in results) else 'Wrong Answer'
-        solution.output = json.dumps(results)
-        solution.time = total_time
-        solution.memory = total_memory
-        solution.save()
+            # Determinar el estado final
+            solution.status = final_status(results)
+            solution.output = results_summary(results)
+            solution.time = total_time
+            solution.memory = total_memory
+            with transaction.atomic():
+                solution.save()
+                save_testcase_results(solution, results)
 
-        # Actualizar estadísticas del usuario
-        solution.user.actualizar_estadisticas()
-        send_feedback(
-            solution_id,
-            total_testcases,
-            total_testcases,
-            "Completed",
-            f"Solution {solution.status}"
-        )
+            if cached is None:
+                store_verdict(cache_key, solution.status, results, total_time, total_memory)
 
-        # Otorgar experiencia y actualizar racha si la solución es aceptada
-        if solution.status == 'Accepted':
-            dificultad = solution.problem.difficulty
-            experiencia = solution.user.otorgar_experiencia(dificultad)
-            solution.user.actualizar_racha()
+            progress.publish(CompletedEvent(solution.status, total_testcases))
 
-            logger.info(
-                f"Se otorgaron {experiencia} puntos de experiencia a {solution.user.username} "
-                f"por resolver un problema {dificultad}."
-            )
+        # Estadísticas, experiencia, racha y ranking se aplican en una etapa aparte
+        # (ver users.tasks); el worker del juez queda libre con el veredicto guardado
+        schedule_user_stats(solution.user_id, solution.id)
 
         # Notificar al usuario
         notify_user(solution.user.id, solution.status, solution.output)
@@ -426,8 +511,77 @@ def evaluate_solution(self, solution_id):
         solution.status = "Error"
         solution.output = str(exc)
         solution.save()
-        solution.user.actualizar_estadisticas()
+        schedule_user_stats(solution.user_id, solution.id)
 
         # Notificar al usuario sobre el error
         notify_user(solution.user.id, "Error", str(exc))
         raise
+
+
+@shared_task(ignore_result=True)
+def rejudge_problem(problem_id):
+    """
+    Reevalúa en segundo plano todas las soluciones calificadas de un problema, por
+    ejemplo después de corregir sus casos de prueba. Cada solución va como una tarea
+    aparte en la cola "rejudge", así nunca se adelanta a los envíos en vivo; al terminar
+    todas, las estadísticas de los usuarios afectados se corrigen una sola vez.
+    """
+    solution_ids = list(
+        Solution.objects.filter(problem_id=problem_id)
+        .exclude(status='Pending')
+        .values_list('id', flat=True)
+    )
+    if solution_ids:
+        chord(rejudge_solution.s(solution_id) for solution_id in solution_ids)(rejudge_update_users.s())
+
+
+@shared_task
+def rejudge_solution(solution_id):
+    """
+    Vuelve a calificar la solución sin usar la caché de veredictos. Las estadísticas
+    se suman una sola vez por solución (ver users.tasks), así que aquí solo se calcula
+    cuánto cambia la experiencia del usuario; la corrige rejudge_update_users.
+    Devuelve el id del usuario y esa diferencia.
+    """
+    from users.models import CustomUser
+
+    def experiencia(solution):
+        # Una solución que aún no se suma a las estadísticas se sumará ya con el veredicto nuevo
+        if solution.status != 'Accepted' or not before.stats_applied:
+            return 0
+        return CustomUser.calcular_experiencia(solution.problem.difficulty, solution.time, solution.memory)
+
+    solutions = Solution.objects.select_related('problem').only(
+        'id', 'user_id', 'status', 'time', 'memory', 'stats_applied', 'problem__difficulty'
+    )
+    before = solutions.get(pk=solution_id)
+    try:
+        evaluate_solution(solution_id, use_cache=False)
+    except Exception:
+        # evaluate_solution ya guardó el error en la solución
+        logger.exception(f"No se pudo reevaluar la solución {solution_id}")
+    after = solutions.get(pk=solution_id)
+    return [before.user_id, experiencia(after) - experiencia(before)]
+
+
+@shared_task(ignore_result=True)
+def rejudge_update_users(outcomes):
+    """
+    Corrige las estadísticas de los usuarios cuyas soluciones se reevaluaron: recalcula
+    sus contadores desde cero, ajusta la experiencia de los veredictos que cambiaron y
+    actualiza su posición en el leaderboard.
+    """
+    from users.models import CustomUser
+    from users.notifications import send_stats_update
+    from users.stats import rebuild_user_counters
+
+    experiencia = {}
+    for user_id, delta in outcomes:
+        experiencia[user_id] = experiencia.get(user_id, 0) + delta
+
+    rebuild_user_counters(CustomUser, Solution, list(experiencia))
+    for user_id, delta in experiencia.items():
+        if delta:
+            CustomUser.sumar_experiencia(user_id, delta)
+            CustomUser.objects.only('id', 'puntos_experiencia').get(pk=user_id).actualizar_ranking()
+        send_stats_update(user_id)
@@ -1,3 +1,217 @@
-from django.test import TestCase
+import base64
+import time
+from types import SimpleNamespace
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from rest_framework.test import APIClient
+
+from problems.models import Example, Problem
+from testcases.comparators import OutputComparator
+from testcases.models import TestCase as ProblemTestCase
+
+from .bundles import bundle_case
+from .models import Solution
+from .sandbox import get_sandbox_pool
+from .tasks import evaluate_solution, judge_testcases, run_visible_cases, sandbox_workers
+from .verdict_cache import get_cached_verdict, store_verdict, verdict_key
+
+LOCMEM_CACHE = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+
+SUM_SOLUTION = "def suma(xs):\n    return sum(xs)\n"
+LOOP_SOLUTION = "def suma(xs):\n    while True:\n        pass\n"
+
+
+class SandboxTimeLimitTests(SimpleTestCase):
+    def test_timed_out_case_is_killed_and_pool_recovers(self):
+        pool = get_sandbox_pool()
+        executions = pool.run_parallel(LOOP_SOLUTION, [[1]], time_limit=1)
+        self.assertEqual(executions[0]['status'], 'Time Limit Exceeded')
+
+        # El sandbox que excedió el tiempo se reemplaza y el siguiente caso corre normal
+        executions = pool.run_parallel(SUM_SOLUTION, [[1, 2]], time_limit=1)
+        self.assertEqual(executions[0]['result'], [3])
+
+    def test_slow_module_load_does_not_count_against_the_case(self):
+        slow_load = "import time\ntime.sleep(1.5)\n" + SUM_SOLUTION
+        executions = get_sandbox_pool().run_parallel(slow_load, [[1, 2]], time_limit=1)
+        self.assertEqual(executions[0]['result'], [3])
+
+    def test_cases_after_the_budget_are_not_run(self):
+        executions = get_sandbox_pool().run_parallel(LOOP_SOLUTION, [[1]] * 4, time_limit=1, budget=2.5)
+        self.assertEqual(executions[0]['status'], 'Time Limit Exceeded')
+        self.assertIsNone(executions[-1])
+
+
+@mock.patch('solutions.tasks.TIME_LIMIT_SECONDS', 1)
+class JudgeTestcasesTests(SimpleTestCase):
+    def judge(self, code, expected_outputs, policy):
+        testcases = [
+            bundle_case(index, '[1, 2]', expected) for index, expected in enumerate(expected_outputs)
+        ]
+        results, _, _ = judge_testcases(
+            SimpleNamespace(code=code), testcases, policy, OutputComparator('float'), mock.Mock()
+        )
+        return [result['status'] for result in results]
+
+    def test_each_result_is_published_as_it_arrives(self):
+        published = []
+        progress = mock.Mock()
+        progress.publish.side_effect = lambda event: published.append((event.test_case_number, time.monotonic()))
+        slow = "import time\ndef suma(xs):\n    time.sleep(0.5)\n    return sum(xs)\n"
+        testcases = [bundle_case(index, '[1, 2]', '[3]') for index in range(2)]
+
+        judge_testcases(SimpleNamespace(code=slow), testcases, 'full_report', OutputComparator('float'), progress)
+        finished = time.monotonic()
+
+        self.assertEqual([number for number, _ in published], [1, 2])
+        # El primer caso se publica mientras el segundo todavía corre
+        self.assertLess(published[0][1], finished - 0.4)
+
+    def test_fail_fast_skips_cases_after_first_failure(self):
+        statuses = self.judge(SUM_SOLUTION, ['[3]', '[4]', '[3]'], 'fail_fast')
+        self.assertEqual(statuses, ['Passed', 'Failed', 'Skipped'])
+
+    def test_full_report_runs_every_case(self):
+        statuses = self.judge(SUM_SOLUTION, ['[3]', '[4]', '[3]'], 'full_report')
+        self.assertEqual(statuses, ['Passed', 'Failed', 'Passed'])
+
+    def test_fail_fast_stops_at_time_limit(self):
+        statuses = self.judge(LOOP_SOLUTION, ['[3]', '[3]'], 'fail_fast')
+        self.assertEqual(statuses, ['Time Limit Exceeded', 'Skipped'])
+
+    def test_full_report_keeps_running_after_time_limit(self):
+        statuses = self.judge(LOOP_SOLUTION, ['[3]', '[3]'], 'full_report')
+        self.assertEqual(statuses, ['Time Limit Exceeded', 'Time Limit Exceeded'])
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class VerdictCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(username='juez', email='juez@example.com')
+        self.problem = Problem.objects.create(title='Suma', description='Suma la lista', difficulty='Easy')
+        ProblemTestCase.objects.create(problem=self.problem, input='[1, 2]', expected_output='[3]')
+
+        for target in ('schedule_user_stats', 'notify_user', 'notify_solution', 'ProgressPublisher'):
+            patcher = mock.patch(f'solutions.tasks.{target}')
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def submit(self, code):
+        solution = Solution.objects.create(user=self.user, problem=self.problem, language='python', code=code)
+        evaluate_solution(solution.id)
+        solution.refresh_from_db()
+        return solution
+
+    def test_equivalent_code_reuses_verdict(self):
+        self.assertEqual(self.submit(SUM_SOLUTION).status, 'Accepted')
+
+        # Mismo AST con otro formato y comentarios: no se vuelve a ejecutar
+        with mock.patch('solutions.tasks.judge_testcases') as judge:
+            solution = self.submit("# suma\ndef suma(xs):\n\n    return sum( xs )\n")
+        judge.assert_not_called()
+        self.assertEqual(solution.status, 'Accepted')
+        self.assertEqual(solution.test_case_results.get().status, 'Passed')
+
+    def test_changed_testcases_invalidate_verdict(self):
+        self.submit(SUM_SOLUTION)
+        # La versión del conjunto cambia al confirmar la transacción (ver testcases.signals)
+        with self.captureOnCommitCallbacks(execute=True):
+            ProblemTestCase.objects.create(problem=self.problem, input='[5]', expected_output='[5]')
+
+        with mock.patch('solutions.tasks.judge_testcases', wraps=judge_testcases) as judge:
+            self.submit(SUM_SOLUTION)
+        judge.assert_called_once()
+
+    def test_rejudge_bypasses_cached_verdict(self):
+        solution = self.submit(SUM_SOLUTION)
+
+        with mock.patch('solutions.tasks.judge_testcases', wraps=judge_testcases) as judge:
+            evaluate_solution(solution.id, use_cache=False)
+        judge.assert_called_once()
+
+    def test_problem_measurement_backend_reaches_the_judge(self):
+        self.problem.measurement = 'tracemalloc'
+        self.problem.save()
+
+        with mock.patch('solutions.tasks.judge_testcases', wraps=judge_testcases) as judge:
+            solution = self.submit(SUM_SOLUTION)
+        self.assertEqual(judge.call_args.args[5], 'tracemalloc')
+        self.assertEqual(solution.status, 'Accepted')
+
+    def test_problem_can_run_its_cases_in_one_sandbox(self):
+        with mock.patch('solutions.tasks.PARALLEL_SANDBOXES', 2):
+            self.assertEqual(sandbox_workers(self.problem), 2)
+            self.problem.parallel_sandboxes = 1
+            self.problem.save()
+
+            with mock.patch('solutions.tasks.judge_testcases', wraps=judge_testcases) as judge:
+                self.submit(SUM_SOLUTION)
+        self.assertEqual(judge.call_args.kwargs['workers'], 1)
+
+    def test_sandbox_crash_is_not_cached(self):
+        comparator = OutputComparator('float')
+        testcases = [bundle_case(1, '[1]', '[1]')]
+        key = verdict_key(self.problem.id, SUM_SOLUTION, testcases, 'full_report', comparator)
+        crashed = {'testcase_id': 1, 'status': 'Runtime Error', 'sandbox_crashed': True}
+
+        store_verdict(key, 'Runtime Error', [crashed], 0, 0)
+        self.assertIsNone(get_cached_verdict(key))
+
+        store_verdict(key, 'Memory Limit Exceeded', [], 0, 0)
+        self.assertIsNone(get_cached_verdict(key))
+
+
+@override_settings(CACHES=LOCMEM_CACHE)
+class RunSolutionTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = get_user_model().objects.create(username='runner', email='runner@example.com')
+        self.problem = Problem.objects.create(title='Saludo', description='Saluda', difficulty='Easy')
+        Example.objects.create(problem=self.problem, input_data='"Ana"', output_data='Hola Ana', explanation='')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+        patcher = mock.patch('solutions.tasks.run_visible_cases.apply_async', return_value=SimpleNamespace(id='run-1'))
+        self.apply_async = patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def run_code(self, code):
+        return self.client.post('/solutions/run/', {
+            'problem_id': self.problem.id,
+            'code': base64.b64encode(code.encode()).decode(),
+        }, format='json')
+
+    def test_run_is_queued_without_waiting(self):
+        response = self.run_code("def saludo(nombre):\n    return 'Hola ' + nombre\n")
+
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data, {'run_id': 'run-1', 'status': 'Pending'})
+        args = self.apply_async.call_args.args[0]
+        self.assertEqual(args[1:], (self.problem.id, None, self.user.id))
+
+    def test_result_is_polled_by_its_owner(self):
+        self.run_code("def saludo(nombre):\n    return nombre\n")
+        run = {'source': 'examples', 'status': 'Accepted', 'results': []}
+        finished = mock.Mock(**{'ready.return_value': True, 'successful.return_value': True, 'result': run})
+
+        with mock.patch('solutions.views.AsyncResult', return_value=finished):
+            response = self.client.get('/solutions/run/run-1/')
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual(response.data['status'], 'Accepted')
+
+            other = APIClient()
+            other.force_authenticate(get_user_model().objects.create(username='otro', email='otro@example.com'))
+            self.assertEqual(other.get('/solutions/run/run-1/').status_code, 404)
+
+    @mock.patch('solutions.tasks.TIME_LIMIT_SECONDS', 1)
+    def test_examples_with_text_output_are_compared_as_text(self):
+        run = run_visible_cases.run("def saludo(nombre):\n    return 'Hola ' + nombre\n", self.problem.id)
+        self.assertEqual(run['source'], 'examples')
+        self.assertEqual(run['results'][0]['status'], 'Passed')
+
+        run = run_visible_cases.run("def saludo(nombre):\n    return 'Adiós'\n", self.problem.id)
+        self.assertEqual(run['results'][0]['status'], 'Failed')
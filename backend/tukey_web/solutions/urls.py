@@ -1,14 +1,20 @@
 from django.urls import path
 from .views import (
     SubmitSolutionView, 
+    RunSolutionView,
+    RunResultView,
     RecentSolutionsView,
     SolutionDetailView,
     ProblemSubmissionsView,
+    SolutionTestCaseResultsView,
 )
 
 urlpatterns = [
     path('submit/', SubmitSolutionView.as_view(), name='submit_solution'),
+    path('run/', RunSolutionView.as_view(), name='run_solution'),
+    path('run/<str:run_id>/', RunResultView.as_view(), name='run_result'),
     path('recent/', RecentSolutionsView.as_view(), name='recent-solutions'),
     path('<int:solution_id>/', SolutionDetailView.as_view(), name='solution_detail'),  # Nuevo endpoint
+    path('<int:solution_id>/results/', SolutionTestCaseResultsView.as_view(), name='solution_testcase_results'),
     path('problems/<int:problem_id>/submissions/', ProblemSubmissionsView.as_view(), name='problem-submissions'),
 ]
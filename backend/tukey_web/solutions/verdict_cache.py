@@ -0,0 +1,66 @@
+import ast
+import hashlib
+
+from django.conf import settings
+from django.core.cache import cache
+
+from testcases.cache import testset_version
+
+# Tiempo que se conserva un veredicto en caché (segundos)
+VERDICT_CACHE_TIMEOUT = getattr(settings, 'JUDGE_VERDICT_CACHE_TIMEOUT', 60 * 60 * 24)
+
+# Veredictos que no dependen de la carga del juez y se pueden reutilizar. El límite de
+# memoria se mide sobre la memoria que cada worker tenía al forkear el sandbox, así que
+# no es determinista y no se guarda
+CACHEABLE_STATUSES = ('Accepted', 'Wrong Answer', 'Runtime Error')
+
+
+def normalized_code_hash(code):
+    """
+    Hash del AST de la solución: ignora comentarios, espacios y formato.
+    Devuelve None si el código no se puede parsear.
+    """
+    try:
+        tree = ast.parse(code)
+    except (SyntaxError, ValueError):
+        return None
+    return hashlib.sha256(ast.dump(tree).encode('utf-8')).hexdigest()
+
+
+def testset_fingerprint(testcases):
+    """Huella de los casos de prueba tal como están guardados."""
+    digest = hashlib.sha256()
+    for testcase in testcases:
+        digest.update(f"{testcase.id}\0{testcase.input}\0{testcase.expected_output}\0".encode('utf-8'))
+    return digest.hexdigest()
+
+
+def verdict_key(problem_id, code, testcases, policy, comparator, measurement=None):
+    # El backend de medición cambia el tiempo y la memoria guardados con el veredicto
+    code_hash = normalized_code_hash(code)
+    if code_hash is None:
+        return None
+    return (
+        f"verdict:{problem_id}:{testset_version(problem_id)}:"
+        f"{testset_fingerprint(testcases)}:{policy}:{comparator.signature}:{measurement or ''}:{code_hash}"
+    )
+
+
+def get_cached_verdict(key):
+    if key is None:
+        return None
+    return cache.get(key)
+
+
+def store_verdict(key, status, results, total_time, total_memory):
+    if key is None or status not in CACHEABLE_STATUSES:
+        return
+    # Un sandbox que murió puede deberse al juez (memoria del worker, señales externas)
+    if any(result.get('sandbox_crashed') for result in results):
+        return
+    cache.set(key, {
+        "status": status,
+        "results": results,
+        "time": total_time,
+        "memory": total_memory,
+    }, VERDICT_CACHE_TIMEOUT)
@@ -4,19 +4,34 @@ from rest_framework.permissions import IsAuthenticated
 from rest_framework import status
 from django.core.exceptions import ValidationError
 from .models import Solution, Problem
-from .tasks import evaluate_solution
+from .tasks import evaluate_solution, run_visible_cases
+from rest_framework.throttling import ScopedRateThrottle
+from celery.result import AsyncResult
+from django.core.cache import cache
+from django.conf import settings
 import base64
 import binascii
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from .models import Solution
-from .serializers import SolutionSerializer
+from .models import Solution, SolutionTestCaseResult
+from .serializers import SolutionSerializer, SolutionTestCaseResultSerializer
+from rest_framework.pagination import PageNumberPagination
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from .models import Solution
 
 
+# Tiempo que una ejecución "Run" puede esperar en la cola; después el worker la descarta (segundos)
+RUN_WAIT_SECONDS = getattr(settings, 'JUDGE_RUN_WAIT_SECONDS', 20)
+# Tiempo que se puede consultar el resultado de una ejecución "Run" (segundos)
+RUN_RESULT_TIMEOUT = 60 * 10
+
+
+def _run_owner_key(run_id):
+    return f"solution_run_owner:{run_id}"
+
+
 class SubmitSolutionView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -29,6 +44,8 @@ class SubmitSolutionView(APIView):
             problem_id = data.get('problem_id')
             language = data.get('language')
             encoded_code = data.get('code')
+            # Política de evaluación opcional; si no se envía se usa la del problema
+            policy = data.get('policy')
 
             if not problem_id or not language or not encoded_code:
                 raise ValidationError({
@@ -37,6 +54,9 @@ class SubmitSolutionView(APIView):
                     'code': 'This field is required.' if not encoded_code else None,
                 })
 
+            if policy and policy not in dict(Problem.JUDGE_POLICY_CHOICES):
+                raise ValidationError({'policy': f'Invalid policy. Use one of: {", ".join(dict(Problem.JUDGE_POLICY_CHOICES))}.'})
+
             # Decodificar el código
             try:
                 decoded_code = base64.b64decode(encoded_code).decode('utf-8')
@@ -65,7 +85,7 @@ class SubmitSolutionView(APIView):
             )
 
             # Disparar el task de Celery
-            evaluate_solution.delay(solution.id)
+            evaluate_solution.delay(solution.id, policy)
 
             # Retornar respuesta al cliente
             return Response(
@@ -87,6 +107,94 @@ class SubmitSolutionView(APIView):
                 {'error': f'An unexpected error occurred: {str(e)}'},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+class RunSolutionView(APIView):
+    """
+    Ejecuta el código contra los casos visibles, los ejemplos o una entrada propia.
+    No crea soluciones ni toca estadísticas. El código corre en un worker de la cola
+    "run" (ver run_visible_cases); la vista responde de inmediato con el id de la
+    ejecución, y el resultado llega por el socket del usuario o en RunResultView.
+    """
+    permission_classes = [IsAuthenticated]
+    throttle_classes = [ScopedRateThrottle]
+    throttle_scope = 'solution_run'
+
+    def post(self, request):
+        try:
+            data = request.data
+
+            problem_id = data.get('problem_id')
+            encoded_code = data.get('code')
+            # Entrada propia opcional; sin ella se usan los casos visibles o los ejemplos
+            custom_input = data.get('input')
+
+            if not problem_id or not encoded_code:
+                raise ValidationError({
+                    'problem_id': 'This field is required.' if not problem_id else None,
+                    'code': 'This field is required.' if not encoded_code else None,
+                })
+
+            try:
+                decoded_code = base64.b64decode(encoded_code).decode('utf-8')
+            except (binascii.Error, UnicodeDecodeError):
+                return Response(
+                    {'error': 'Invalid Base64 encoding for code.'},
+                    status=status.HTTP_400_BAD_REQUEST
+                )
+
+            if not Problem.objects.filter(id=problem_id).exists():
+                return Response(
+                    {'error': 'The specified problem does not exist.'},
+                    status=status.HTTP_404_NOT_FOUND
+                )
+
+            # Si nadie toma la ejecución a tiempo, el worker la descarta en lugar de correrla tarde
+            task = run_visible_cases.apply_async(
+                (decoded_code, problem_id, custom_input, request.user.id), expires=RUN_WAIT_SECONDS
+            )
+            cache.set(_run_owner_key(task.id), request.user.id, RUN_RESULT_TIMEOUT)
+            return Response(
+                {'run_id': task.id, 'status': 'Pending'},
+                status=status.HTTP_202_ACCEPTED
+            )
+
+        except ValidationError as e:
+            return Response(
+                {'error': e.message_dict},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        except Exception as e:
+            return Response(
+                {'error': f'An unexpected error occurred: {str(e)}'},
+                status=status.HTTP_500_INTERNAL_SERVER_ERROR
+            )
+
+
+class RunResultView(APIView):
+    """Resultado de una ejecución "Run" del usuario; 202 mientras sigue en curso."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, run_id):
+        if cache.get(_run_owner_key(run_id)) != request.user.id:
+            return Response({'error': 'Run not found.'}, status=status.HTTP_404_NOT_FOUND)
+
+        task = AsyncResult(run_id, app=run_visible_cases.app)
+        if not task.ready():
+            return Response({'run_id': run_id, 'status': 'Pending'}, status=status.HTTP_202_ACCEPTED)
+        if not task.successful():
+            # Incluye las ejecuciones que expiraron en la cola sin llegar a correr
+            return Response(
+                {'error': 'The run could not be completed. Please try again.'},
+                status=status.HTTP_503_SERVICE_UNAVAILABLE
+            )
+
+        run = task.result
+        if run is None:
+            return Response(
+                {'error': 'This problem has no visible test cases or examples.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        return Response(dict(run, run_id=run_id), status=status.HTTP_200_OK)
+
 class RecentSolutionsView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -143,6 +251,33 @@ class SolutionDetailView(APIView):
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
 
+class TestCaseResultPagination(PageNumberPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SolutionTestCaseResultsView(APIView):
+    """Resultados por caso de prueba de una solución, paginados y filtrables por ?status=."""
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, solution_id):
+        if not Solution.objects.filter(id=solution_id, user=request.user).exists():
+            return Response(
+                {"error": "Solution not found or does not belong to the authenticated user."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+
+        results = SolutionTestCaseResult.objects.filter(solution_id=solution_id)
+        result_status = request.query_params.get('status')
+        if result_status:
+            results = results.filter(status=result_status)
+
+        paginator = TestCaseResultPagination()
+        page = paginator.paginate_queryset(results, request, view=self)
+        serializer = SolutionTestCaseResultSerializer(page, many=True)
+        return paginator.get_paginated_response(serializer.data)
+
 class ProblemSubmissionsView(APIView):
     permission_classes = [IsAuthenticated]
 
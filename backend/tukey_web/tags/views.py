@@ -1,12 +1,23 @@
-from django.http import JsonResponse
-from .models import Category
+import json
+
+from django.db.models import Count, Prefetch
+from django.http import HttpResponse
+from django.views.decorators.http import condition
+from .models import Category, Tag
+from problems.cache import cached_catalog, catalog_etag, catalog_last_modified, revalidate
 from rest_framework.permissions import IsAuthenticated
 from rest_framework.decorators import api_view, permission_classes
 
-@api_view(['GET'])
-@permission_classes([IsAuthenticated])
-def list_categories_with_tags(request):
-    categories = Category.objects.all()
+
+def build_category_tree():
+    """
+    Árbol categoría → etiquetas con la cantidad de problemas de cada etiqueta, en dos
+    consultas: las categorías y, de una vez, las etiquetas de todas con su conteo.
+    Se guarda ya serializado en la caché del catálogo, que se invalida al cambiar
+    categorías, etiquetas o problemas (ver problems.signals).
+    """
+    tags = Tag.objects.annotate(problem_count=Count('problems')).order_by('name')
+    categories = Category.objects.order_by('name').prefetch_related(Prefetch('tags', queryset=tags))
     data = [
         {
             "id": category.id,
@@ -14,10 +25,26 @@ def list_categories_with_tags(request):
             "description": category.description,
             "slug": category.slug,
             "tags": [
-                {"id": tag.id, "name": tag.name, "description": tag.description}
+                {
+                    "id": tag.id,
+                    "name": tag.name,
+                    "description": tag.description,
+                    "problem_count": tag.problem_count,
+                }
                 for tag in category.tags.all()
             ],
         }
         for category in categories
     ]
-    return JsonResponse({"categories": data})
+    return json.dumps({"categories": data})
+
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@condition(
+    etag_func=lambda request: catalog_etag('categories'),
+    last_modified_func=lambda request: catalog_last_modified(),
+)
+def list_categories_with_tags(request):
+    payload = cached_catalog('categories', build_category_tree)
+    return revalidate(HttpResponse(payload, content_type='application/json'))
@@ -0,0 +1,15 @@
+from tukey_web.cache_versions import bump_version, get_version
+
+
+def _testset_version_key(problem_id):
+    return f"testset_version:{problem_id}"
+
+
+def testset_version(problem_id):
+    """Versión del conjunto de casos de prueba de un problema (ver tukey_web.cache_versions)."""
+    return get_version(_testset_version_key(problem_id))
+
+
+def bump_testset_version(problem_id):
+    """Invalida todo lo que dependa de los casos de prueba del problema."""
+    bump_version(_testset_version_key(problem_id))
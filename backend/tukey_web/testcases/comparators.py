@@ -0,0 +1,180 @@
+import json
+import math
+
+try:
+    import numpy as np
+except ImportError:  # NumPy es opcional; sin él se compara con Python puro
+    np = None
+
+try:
+    import pandas as pd
+except ImportError:
+    pd = None
+
+DEFAULT_ABS_TOL = 1e-6
+DEFAULT_REL_TOL = 0.0
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _from_pandas(value, reference):
+    """Convierte DataFrame/Series a la forma del valor de referencia (dict o arreglo)."""
+    if pd is None:
+        return value
+    if isinstance(value, pd.DataFrame):
+        if isinstance(reference, dict):
+            return value.to_dict(orient='list')
+        return value.to_numpy()
+    if isinstance(value, pd.Series):
+        if isinstance(reference, dict):
+            return value.to_dict()
+        return value.to_numpy()
+    return value
+
+
+def _numeric_array(value):
+    """Arreglo NumPy numérico para listas anidadas o arreglos; None si no aplica."""
+    if np is None or not isinstance(value, (list, tuple, np.ndarray)):
+        return None
+    try:
+        array = np.asarray(value)
+    except (ValueError, TypeError):
+        return None
+    if array.dtype.kind not in 'iuf' or array.size == 0:
+        return None
+    return array
+
+
+def to_jsonable(value):
+    """Convierte arreglos NumPy y estructuras de pandas a tipos serializables con json."""
+    if pd is not None and isinstance(value, pd.DataFrame):
+        return value.to_dict(orient='list')
+    if pd is not None and isinstance(value, pd.Series):
+        return value.tolist()
+    if np is not None and isinstance(value, np.ndarray):
+        return value.tolist()
+    if np is not None and isinstance(value, np.generic):
+        return value.item()
+    if isinstance(value, (list, tuple)):
+        return [to_jsonable(item) for item in value]
+    if isinstance(value, dict):
+        return {key: to_jsonable(item) for key, item in value.items()}
+    return value
+
+
+class OutputComparator:
+    """
+    Compara la salida de una solución con la esperada.
+
+    Modos:
+    - exact: igualdad estricta, también para números.
+    - float: números con tolerancia absoluta/relativa (modo por defecto).
+    - unordered: como float, pero ignora el orden de la lista de primer nivel.
+
+    NaN coincide con NaN y los booleanos no coinciden con números.
+    Las estructuras anidadas (listas y dicts) se comparan de forma recursiva. Los
+    arreglos numéricos, incluidos arreglos NumPy y DataFrames de pandas, se comparan
+    vectorizados cuando NumPy está disponible.
+    """
+
+    MODES = ('exact', 'float', 'unordered')
+
+    def __init__(self, mode='float', abs_tol=DEFAULT_ABS_TOL, rel_tol=DEFAULT_REL_TOL):
+        if mode not in self.MODES:
+            raise ValueError(f"Comparador desconocido: {mode}")
+        self.mode = mode
+        self.abs_tol = abs_tol
+        self.rel_tol = rel_tol
+
+    @classmethod
+    def for_problem(cls, problem):
+        options = problem.comparator_options or {}
+        return cls(
+            mode=problem.comparator,
+            abs_tol=options.get('abs_tol', DEFAULT_ABS_TOL),
+            rel_tol=options.get('rel_tol', DEFAULT_REL_TOL),
+        )
+
+    @property
+    def signature(self):
+        """Identifica la configuración; sirve para llaves de caché."""
+        return f"{self.mode}:{self.abs_tol}:{self.rel_tol}"
+
+    def compare(self, expected, actual):
+        actual = _from_pandas(actual, expected)
+        expected = _from_pandas(expected, actual)
+
+        if self.mode == 'unordered':
+            expected_array = _numeric_array(expected)
+            actual_array = _numeric_array(actual)
+            if expected_array is not None and actual_array is not None:
+                if expected_array.shape != actual_array.shape:
+                    return False
+                return self._arrays_equal(_sort_rows(expected_array), _sort_rows(actual_array))
+            if np is not None and isinstance(actual, np.ndarray):
+                actual = actual.tolist()
+            if isinstance(expected, (list, tuple)) and isinstance(actual, (list, tuple)):
+                if len(expected) != len(actual):
+                    return False
+                expected = sorted(expected, key=_sort_key)
+                actual = sorted(actual, key=_sort_key)
+
+        return self._equal(expected, actual)
+
+    def _equal(self, expected, actual):
+        expected_array = _numeric_array(expected)
+        if expected_array is not None:
+            actual_array = _numeric_array(actual)
+            if actual_array is not None:
+                return self._arrays_equal(expected_array, actual_array)
+
+        if isinstance(expected, dict):
+            return (
+                isinstance(actual, dict)
+                and expected.keys() == actual.keys()
+                and all(self._equal(expected[key], actual[key]) for key in expected)
+            )
+
+        if isinstance(expected, (list, tuple)) or (np is not None and isinstance(expected, np.ndarray)):
+            if not isinstance(actual, (list, tuple)) and not (np is not None and isinstance(actual, np.ndarray)):
+                return False
+            return len(expected) == len(actual) and all(
+                self._equal(e, a) for e, a in zip(expected, actual)
+            )
+
+        if _is_number(expected) and _is_number(actual):
+            # NaN solo coincide con NaN
+            if math.isnan(expected) or math.isnan(actual):
+                return math.isnan(expected) and math.isnan(actual)
+            if self.mode == 'exact':
+                return expected == actual
+            return math.isclose(actual, expected, rel_tol=self.rel_tol, abs_tol=self.abs_tol)
+
+        # True == 1 en Python, pero un booleano no es una respuesta numérica
+        if isinstance(expected, bool) != isinstance(actual, bool):
+            return False
+        return expected == actual
+
+    def _arrays_equal(self, expected, actual):
+        if expected.shape != actual.shape:
+            return False
+        if self.mode == 'exact':
+            return bool(np.array_equal(expected, actual, equal_nan=True))
+        return bool(np.allclose(actual, expected, rtol=self.rel_tol, atol=self.abs_tol, equal_nan=True))
+
+
+def _sort_rows(array):
+    """Ordena un arreglo por filas completas (lexicográficamente) sin mezclar columnas."""
+    if array.ndim == 1:
+        return np.sort(array)
+    rows = array.reshape(len(array), -1)
+    return array[np.lexsort(rows.T[::-1])]
+
+
+def _sort_key(value):
+    """Llave estable para ordenar valores heterogéneos: primero números, luego el resto por su JSON."""
+    if _is_number(value):
+        return (0, value, '')
+    return (1, 0, json.dumps(to_jsonable(value), sort_keys=True, default=str))
@@ -2,6 +2,7 @@ import ast
 import json
 from django.db import models
 from problems.models import Problem
+from .comparators import OutputComparator
 
 class TestCase(models.Model):
     problem = models.ForeignKey(Problem, on_delete=models.CASCADE, related_name='testcases')
@@ -84,14 +85,16 @@ class TestCase(models.Model):
             else:
                 formatted_output = str(actual_output)
 
+            passed = self.validate_output(actual_output)
+
             return {
                 "input": self.get_formatted_input(),
                 "expected": expected,
                 "output": formatted_output,
                 "execution_time": execution_time,
                 "peak_memory": peak_memory,
-                "status": "Passed" if str(formatted_output).strip() == str(expected).strip() else "Failed",
-                "error_message": "" if str(formatted_output).strip() == str(expected).strip() else 
+                "status": "Passed" if passed else "Failed",
+                "error_message": "" if passed else
                     "La salida no coincide con el resultado esperado"
             }
         except Exception as e:
@@ -107,20 +110,17 @@ class TestCase(models.Model):
 
     def validate_output(self, actual_output):
         """
-        Valida si la salida actual coincide con la esperada
+        Valida si la salida actual coincide con la esperada usando el comparador del problema,
+        el mismo que usa el juez
         """
         try:
             expected = self.get_expected_output()
-            if isinstance(expected, (list, tuple)):
-                expected = list(expected)
-            if isinstance(actual_output, (list, tuple)):
-                actual_output = list(actual_output)
-            
-            # Convertir ambos a strings para comparación
-            expected_str = str(expected).strip()
-            actual_str = str(actual_output).strip()
-            
-            return expected_str == actual_str
+            # El juez compara números sueltos como listas de un elemento
+            if isinstance(expected, (int, float)):
+                expected = [expected]
+            if isinstance(actual_output, (int, float)):
+                actual_output = [actual_output]
+            return OutputComparator.for_problem(self.problem).compare(expected, actual_output)
         except Exception as e:
             return False
 
@@ -0,0 +1,16 @@
+from django.db import transaction
+from django.db.models.signals import post_save, post_delete
+from django.dispatch import receiver
+from .models import TestCase
+from .cache import bump_testset_version
+
+@receiver(post_save, sender=TestCase)
+@receiver(post_delete, sender=TestCase)
+def invalidate_testset(sender, instance, **kwargs):
+    """
+    Cambia la versión del conjunto de casos del problema al crear, editar o borrar un caso.
+    Se hace al confirmar la transacción para que nadie reconstruya el paquete de pruebas
+    con datos sin confirmar bajo la versión nueva.
+    """
+    problem_id = instance.problem_id
+    transaction.on_commit(lambda: bump_testset_version(problem_id))
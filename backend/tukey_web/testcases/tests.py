@@ -1,3 +1,139 @@
-from django.test import TestCase
+import math
+from unittest import skipIf
 
-# Create your tests here.
+from django.test import SimpleTestCase
+
+from .comparators import OutputComparator, np, pd, to_jsonable
+
+
+class FloatToleranceTests(SimpleTestCase):
+    def setUp(self):
+        self.comparator = OutputComparator('float', abs_tol=1e-3)
+
+    def test_difference_at_the_tolerance_passes(self):
+        self.assertTrue(self.comparator.compare([1.0], [1.0 + 1e-3]))
+
+    def test_difference_past_the_tolerance_fails(self):
+        self.assertFalse(self.comparator.compare([1.0], [1.0 + 2e-3]))
+
+    def test_relative_tolerance_scales_with_the_value(self):
+        comparator = OutputComparator('float', abs_tol=0.0, rel_tol=1e-6)
+        self.assertTrue(comparator.compare([1e9], [1e9 + 500]))
+        self.assertFalse(comparator.compare([1.0], [1.0 + 1e-5]))
+
+    def test_exact_mode_has_no_tolerance(self):
+        comparator = OutputComparator('exact')
+        self.assertTrue(comparator.compare([0.5, 2], [0.5, 2]))
+        self.assertFalse(comparator.compare([0.1 + 0.2], [0.3]))
+
+    def test_int_and_float_compare_by_value(self):
+        self.assertTrue(self.comparator.compare([3], [3.0]))
+
+    def test_unknown_mode_is_rejected(self):
+        with self.assertRaises(ValueError):
+            OutputComparator('fuzzy')
+
+
+class SpecialValuesTests(SimpleTestCase):
+    def test_nan_matches_nan(self):
+        for mode in OutputComparator.MODES:
+            comparator = OutputComparator(mode)
+            self.assertTrue(comparator.compare([math.nan], [math.nan]), mode)
+            self.assertFalse(comparator.compare([math.nan], [0.0]), mode)
+            self.assertFalse(comparator.compare([0.0], [math.nan]), mode)
+
+    def test_infinity_matches_only_same_sign(self):
+        comparator = OutputComparator('float')
+        self.assertTrue(comparator.compare([math.inf], [math.inf]))
+        self.assertFalse(comparator.compare([math.inf], [-math.inf]))
+        self.assertFalse(comparator.compare([math.inf], [1e308]))
+
+
+class StructureTests(SimpleTestCase):
+    def setUp(self):
+        self.comparator = OutputComparator('float')
+
+    def test_nested_lists_and_dicts(self):
+        expected = {'media': 2.5, 'valores': [[1, 2], [3, 4]], 'nombre': 'x'}
+        self.assertTrue(self.comparator.compare(expected, {'nombre': 'x', 'valores': [[1, 2], [3, 4.0000001]], 'media': 2.5}))
+        self.assertFalse(self.comparator.compare(expected, {'media': 2.5, 'valores': [[1, 2], [3, 5]], 'nombre': 'x'}))
+        self.assertFalse(self.comparator.compare(expected, {'media': 2.5, 'valores': [[1, 2], [3, 4]]}))
+
+    def test_length_mismatch_fails(self):
+        self.assertFalse(self.comparator.compare([1, 2], [1, 2, 3]))
+        self.assertFalse(self.comparator.compare([[1, 2], [3]], [[1, 2], [3, 4]]))
+
+    def test_mismatched_types_fail(self):
+        self.assertFalse(self.comparator.compare([1], ['1']))
+        self.assertFalse(self.comparator.compare(['a'], [['a']]))
+        self.assertFalse(self.comparator.compare({'a': 1}, [1]))
+        self.assertFalse(self.comparator.compare([1, 0], [True, False]))
+        self.assertFalse(self.comparator.compare([True], [1]))
+
+
+class UnorderedTests(SimpleTestCase):
+    def setUp(self):
+        self.comparator = OutputComparator('unordered')
+
+    def test_order_is_ignored(self):
+        self.assertTrue(self.comparator.compare([3, 1, 2], [1, 2, 3.0000001]))
+        self.assertTrue(self.comparator.compare(['b', 'a'], ['a', 'b']))
+
+    def test_duplicates_must_match_in_count(self):
+        self.assertTrue(self.comparator.compare([1, 1, 2], [2, 1, 1]))
+        self.assertFalse(self.comparator.compare([1, 1, 2], [1, 2, 2]))
+        self.assertFalse(self.comparator.compare([1, 1, 2], [1, 2]))
+
+    def test_rows_are_kept_whole(self):
+        self.assertTrue(self.comparator.compare([[1, 2], [3, 4]], [[3, 4], [1, 2]]))
+        self.assertFalse(self.comparator.compare([[1, 2], [3, 4]], [[1, 4], [3, 2]]))
+
+    def test_mixed_values(self):
+        self.assertTrue(self.comparator.compare([{'a': 1}, 'x', 2], [2, 'x', {'a': 1}]))
+
+    def test_only_the_top_level_is_unordered(self):
+        self.assertFalse(self.comparator.compare([[1, 2]], [[2, 1]]))
+
+
+@skipIf(np is None, "NumPy no está instalado")
+class NumpyTests(SimpleTestCase):
+    def test_arrays_compare_with_lists(self):
+        comparator = OutputComparator('float')
+        self.assertTrue(comparator.compare([[1.0, 2.0], [3.0, 4.0]], np.array([[1, 2], [3, 4.0000001]])))
+        self.assertFalse(comparator.compare([[1.0, 2.0]], np.array([[1.0, 2.0, 3.0]])))
+        self.assertFalse(comparator.compare([1.0, 2.0], np.array([[1.0, 2.0]])))
+
+    def test_unordered_arrays(self):
+        comparator = OutputComparator('unordered')
+        self.assertTrue(comparator.compare([3, 1, 2], np.array([1, 2, 3])))
+        self.assertFalse(comparator.compare([[1, 2], [3, 4]], np.array([[1, 4], [3, 2]])))
+
+    def test_numpy_scalars(self):
+        comparator = OutputComparator('float')
+        self.assertTrue(comparator.compare([1.5, 2], [np.float64(1.5), np.int64(2)]))
+
+    def test_to_jsonable(self):
+        self.assertEqual(to_jsonable({'a': np.array([1, 2]), 'b': np.float32(0.5)}), {'a': [1, 2], 'b': 0.5})
+
+
+@skipIf(pd is None, "pandas no está instalado")
+class PandasTests(SimpleTestCase):
+    def setUp(self):
+        self.comparator = OutputComparator('float')
+        self.frame = pd.DataFrame({'x': [1, 2], 'y': [0.5, 1.5]})
+
+    def test_dataframe_against_dict_of_columns(self):
+        self.assertTrue(self.comparator.compare({'x': [1, 2], 'y': [0.5, 1.5]}, self.frame))
+        self.assertFalse(self.comparator.compare({'x': [1, 2], 'y': [0.5, 2.5]}, self.frame))
+        self.assertFalse(self.comparator.compare({'x': [1, 2]}, self.frame))
+
+    def test_dataframe_against_rows(self):
+        self.assertTrue(self.comparator.compare([[1, 0.5], [2, 1.5]], self.frame))
+
+    def test_series(self):
+        series = pd.Series([1.0, 2.0], index=['a', 'b'])
+        self.assertTrue(self.comparator.compare({'a': 1, 'b': 2}, series))
+        self.assertTrue(self.comparator.compare([1, 2], series))
+
+    def test_to_jsonable(self):
+        self.assertEqual(to_jsonable(self.frame), {'x': [1, 2], 'y': [0.5, 1.5]})
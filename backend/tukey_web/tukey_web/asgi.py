@@ -1,14 +1,19 @@
 import os
 from django.core.asgi import get_asgi_application
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-from tukey_web.routing import websocket_urlpatterns
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'tukey_web.settings')
 
+# Django se configura antes de importar el middleware y las rutas, que usan modelos
+django_asgi_app = get_asgi_application()
+
+from tukey_web.middleware import JWTAuthMiddleware  # noqa: E402
+from tukey_web.routing import websocket_urlpatterns  # noqa: E402
+
 application = ProtocolTypeRouter({
-    "http": get_asgi_application(),
-    "websocket": AuthMiddlewareStack(
+    "http": django_asgi_app,
+    # Autenticación por token (?token=<JWT>) en lugar de sesiones
+    "websocket": JWTAuthMiddleware(
         URLRouter(websocket_urlpatterns)
     ),
 })
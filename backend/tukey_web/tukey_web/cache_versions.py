@@ -0,0 +1,33 @@
+import time
+import uuid
+from datetime import datetime, timezone
+
+from django.core.cache import cache
+
+
+def _new_version():
+    # Marca de tiempo del cambio más un sufijo aleatorio, para que dos cambios simultáneos no coincidan
+    return f"{time.time():.6f}-{uuid.uuid4().hex[:8]}"
+
+
+def get_version(key):
+    """
+    Versión guardada en `key` de la caché compartida, creándola si no existe.
+    Las llaves de caché que dependen de unos datos incluyen su versión, así al cambiar
+    los datos las entradas viejas dejan de ser alcanzables y expiran solas.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, _new_version(), timeout=None)
+        version = cache.get(key)
+    return version
+
+
+def bump_version(key):
+    """Cambia la versión en `key`, invalidando todo lo que dependa de ella."""
+    cache.set(key, _new_version(), timeout=None)
+
+
+def version_time(version):
+    """Momento en que se creó la versión, para encabezados como Last-Modified."""
+    return datetime.fromtimestamp(float(version.split('-')[0]), tz=timezone.utc)
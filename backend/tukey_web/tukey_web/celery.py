@@ -1,5 +1,7 @@
 import os
+import platform
 from celery import Celery
+from celery.signals import celeryd_after_setup, worker_init
 from django.conf import settings
 
 # Establece el módulo de configuración de Django predeterminado
@@ -11,6 +13,46 @@ app = Celery('tukey_web')
 # Configuración detallada
 app.config_from_object('django.conf:settings', namespace='CELERY')
 
+# Pool y concurrencia del worker según la cola que atiende.
+# prefork en Linux/macOS; en Windows solo existe el pool "solo"
+DEFAULT_POOL = 'solo' if platform.system() == 'Windows' else 'prefork'
+CPU_COUNT = os.cpu_count() or 1
+
+WORKER_PROFILES = {
+    'judge': {
+        'pool': os.environ.get('CELERY_JUDGE_POOL', DEFAULT_POOL),
+        # Cada evaluación puede ocupar JUDGE_PARALLEL_SANDBOXES núcleos
+        'concurrency': int(os.environ.get(
+            'CELERY_JUDGE_CONCURRENCY',
+            max(1, CPU_COUNT // int(os.environ.get('JUDGE_PARALLEL_SANDBOXES', 1))),
+        )),
+        'prefetch_multiplier': 1,
+    },
+    'run': {
+        'pool': os.environ.get('CELERY_RUN_POOL', DEFAULT_POOL),
+        # Ejecuciones cortas que el usuario espera en línea: sin prefetch para no hacer fila
+        'concurrency': int(os.environ.get('CELERY_RUN_CONCURRENCY', max(1, CPU_COUNT // 2))),
+        'prefetch_multiplier': 1,
+    },
+    'rejudge': {
+        'pool': os.environ.get('CELERY_REJUDGE_POOL', DEFAULT_POOL),
+        'concurrency': int(os.environ.get('CELERY_REJUDGE_CONCURRENCY', max(1, CPU_COUNT // 2))),
+        'prefetch_multiplier': 1,
+    },
+    'maintenance': {
+        'pool': os.environ.get('CELERY_MAINTENANCE_POOL', DEFAULT_POOL),
+        'concurrency': int(os.environ.get('CELERY_MAINTENANCE_CONCURRENCY', 2)),
+        'prefetch_multiplier': 4,
+    },
+}
+
+# Cola que atiende este worker (CELERY_WORKER_QUEUE=judge|run|rejudge|maintenance).
+# Sin definir, el worker consume todas las colas con el perfil de "judge"
+WORKER_QUEUE = os.environ.get('CELERY_WORKER_QUEUE')
+if WORKER_QUEUE and WORKER_QUEUE not in WORKER_PROFILES:
+    raise ValueError(f"Cola de worker desconocida: {WORKER_QUEUE}")
+worker_profile = WORKER_PROFILES[WORKER_QUEUE or 'judge']
+
 # Configuraciones de depuración y rendimiento
 app.conf.update(
     # Configuraciones de ejecución
@@ -27,9 +69,10 @@ app.conf.update(
     worker_log_format='[%(asctime)s: %(levelname)s/%(processName)s] %(message)s',
     worker_task_log_format='[%(asctime)s: %(levelname)s/%(processName)s][%(task_name)s(%(task_id)s)] %(message)s',
     
-    # Configuraciones específicas para Windows
-    worker_pool='solo',
-    worker_concurrency=1,
+    # Pool y concurrencia según la cola (solo en Windows, prefork en el resto)
+    worker_pool=worker_profile['pool'],
+    worker_concurrency=worker_profile['concurrency'],
+    worker_prefetch_multiplier=worker_profile['prefetch_multiplier'],
     task_queue_max_priority=10,
     
     # Configuraciones de broker
@@ -37,6 +80,24 @@ app.conf.update(
     broker_connection_max_retries=10
 )
 
+@celeryd_after_setup.connect
+def select_worker_queue(sender, instance, **kwargs):
+    """Limita el worker a la cola de CELERY_WORKER_QUEUE, p. ej. CELERY_WORKER_QUEUE=judge."""
+    if WORKER_QUEUE:
+        instance.app.amqp.queues.select([WORKER_QUEUE])
+
+
+@worker_init.connect
+def start_sandbox_server(**kwargs):
+    """
+    Arranca el servidor de sandbox antes de crear los procesos del pool, así todos lo
+    comparten (ver solutions.sandbox). La cola de mantenimiento no ejecuta soluciones.
+    """
+    if WORKER_QUEUE != 'maintenance':
+        from solutions.sandbox import start_sandbox_server
+        start_sandbox_server()
+
+
 # Descubrir tareas automáticamente
 app.autodiscover_tasks(lambda: settings.INSTALLED_APPS)
 
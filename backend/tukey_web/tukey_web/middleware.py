@@ -8,10 +8,13 @@ class JWTAuthMiddleware(BaseMiddleware):
         params = dict(x.split('=') for x in query_string.split('&') if '=' in x)
         token = params.get('token', None)
 
+        # Sin consultas a la base de datos: el id del usuario sale del token
+        scope['user_id'] = None
         if token:
             try:
                 access_token = AccessToken(token)
                 scope['user'] = access_token['user_id']
+                scope['user_id'] = access_token['user_id']
             except Exception:
                 scope['user'] = AnonymousUser()
         else:
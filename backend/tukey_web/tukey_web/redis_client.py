@@ -0,0 +1,24 @@
+import redis
+from redis import asyncio as aioredis
+from django.conf import settings
+
+# Redis para estructuras propias de la aplicación (streams, rankings)
+REDIS_URL = getattr(settings, 'REDIS_URL', 'redis://localhost:6379/3')
+
+_client = None
+
+
+def get_redis():
+    """Cliente síncrono compartido por el proceso; el pool de conexiones es seguro entre hilos."""
+    global _client
+    if _client is None:
+        _client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+    return _client
+
+
+def get_async_redis():
+    """
+    Cliente asíncrono nuevo. Está ligado al event loop donde se usa, así que quien
+    lo crea debe cerrarlo con `aclose()`.
+    """
+    return aioredis.Redis.from_url(REDIS_URL, decode_responses=True)
@@ -1,8 +1,11 @@
 from django.urls import re_path
 from solutions.consumers import SolutionConsumer
+from users.consumers import UserConsumer
 
 # Agrega las rutas de WebSocket de todas las aplicaciones aquí
 websocket_urlpatterns = [
     re_path(r'ws/solutions/(?P<solution_id>\d+)/$', SolutionConsumer.as_asgi()),
+    # Socket único por usuario para todas sus soluciones, estadísticas y ranking
+    re_path(r'ws/user/$', UserConsumer.as_asgi()),
 
 ]
\ No newline at end of file
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.1/ref/settings/
 from pathlib import Path
 from datetime import timedelta
 import os
+from kombu import Queue
 from corsheaders.defaults import default_headers
 import firebase_admin
 from firebase_admin import credentials
@@ -78,6 +79,49 @@ CELERY_TASK_SERIALIZER = 'json'
 CELERY_RESULT_SERIALIZER = 'json'
 CELERY_TIMEZONE = 'UTC'
 
+# Colas: "judge" para envíos en vivo, "run" para ejecuciones de prueba que el usuario
+# espera en línea, "rejudge" para reevaluaciones en segundo plano y "maintenance"
+# para estadísticas y tareas de mantenimiento
+CELERY_TASK_QUEUES = (
+    Queue('judge'),
+    Queue('run'),
+    Queue('rejudge'),
+    Queue('maintenance'),
+)
+CELERY_TASK_DEFAULT_QUEUE = 'maintenance'
+CELERY_TASK_ROUTES = {
+    'solutions.tasks.evaluate_solution': {'queue': 'judge'},
+    'solutions.tasks.run_visible_cases': {'queue': 'run'},
+    'solutions.tasks.rejudge_*': {'queue': 'rejudge'},
+    'users.tasks.*': {'queue': 'maintenance'},
+}
+
+# Caché compartida (veredictos, versiones de casos de prueba)
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+        'LOCATION': os.environ.get('REDIS_CACHE_URL', 'redis://localhost:6379/1'),
+    }
+}
+
+# Redis para streams de progreso y rankings (ver tukey_web.redis_client)
+REDIS_URL = os.environ.get('REDIS_URL', 'redis://localhost:6379/3')
+
+# Configuración del juez
+JUDGE_SANDBOX_POOL_SIZE = int(os.environ.get('JUDGE_SANDBOX_POOL_SIZE', 2))  # Procesos sandbox listos por worker
+JUDGE_PARALLEL_SANDBOXES = int(os.environ.get('JUDGE_PARALLEL_SANDBOXES', 1))  # Sandbox por solución (1 = secuencial)
+JUDGE_SUBMISSION_TIME_BUDGET = 20  # Segundos para todos los casos de una solución; bajo el task_soft_time_limit (25)
+JUDGE_RUN_TIME_BUDGET = 10  # Segundos para los casos de una ejecución de prueba ("Run")
+JUDGE_RUN_WAIT_SECONDS = 20  # Espera máxima de una ejecución "Run" en la cola antes de descartarse
+JUDGE_LOAD_TIME_LIMIT_SECONDS = 5  # Segundos para cargar el módulo de la solución antes de correr los casos
+JUDGE_MEASUREMENT_BACKEND = os.environ.get('JUDGE_MEASUREMENT_BACKEND', 'rusage')  # 'rusage' o 'tracemalloc' (perfil de memoria); Problem.measurement lo cambia por problema
+JUDGE_VERDICT_CACHE_TIMEOUT = 60 * 60 * 24  # Tiempo de vida de los veredictos en caché (segundos)
+JUDGE_TEST_BUNDLE_CACHE_SIZE = 128  # Paquetes de prueba en la LRU local de cada worker
+JUDGE_PROGRESS_FLUSH_EVERY = 10  # Eventos de progreso que fuerzan un envío al WebSocket
+JUDGE_PROGRESS_FLUSH_INTERVAL_MS = 200  # Espera máxima de un evento de progreso antes de enviarse
+JUDGE_PROGRESS_REPLAY_TTL = 300  # Segundos que se conserva el progreso para reenviarlo a sockets tardíos
+USER_STATS_COALESCE_SECONDS = 2  # Espera para juntar en una sola actualización las soluciones calificadas de un usuario
+
 # Logging
 LOGGING = {
     'version': 1,
@@ -118,6 +162,9 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
     ),
+    'DEFAULT_THROTTLE_RATES': {
+        'solution_run': os.environ.get('SOLUTION_RUN_THROTTLE_RATE', '10/min'),  # Ejecuciones de prueba por usuario
+    },
 }
 
 
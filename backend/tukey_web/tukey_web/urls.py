@@ -24,5 +24,6 @@ urlpatterns = [
     path('users/', include('users.urls')),
     path('solutions/', include('solutions.urls')),
     path('problems/', include('problems.urls')),
+    path('tags/', include('tags.urls')),
     # ...otras rutas...
 ] + static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
\ No newline at end of file
@@ -11,7 +11,7 @@ class CustomUserAdmin(UserAdmin):
     fieldsets = (
         (None, {'fields': ('username', 'password')}),
         ('Información Personal', {'fields': ('name', 'last_name', 'email', 'avatar')}),
-        ('Estadísticas', {'fields': ('nivel', 'puntos_experiencia', 'racha', 'ejercicios_completados', 'tasa_exito')}),
+        ('Estadísticas', {'fields': ('nivel', 'puntos_experiencia', 'racha', 'total_intentos', 'ejercicios_completados', 'problemas_resueltos', 'tasa_exito')}),
         ('Permisos', {'fields': ('is_active', 'is_staff', 'is_superuser', 'role')}),
     )
 
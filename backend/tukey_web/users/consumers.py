@@ -0,0 +1,73 @@
+import logging
+
+from channels.db import database_sync_to_async
+from channels.generic.websocket import AsyncWebsocketConsumer
+
+from solutions.events import tag_frame
+from solutions.progress import is_replayed, read_progress, stream_position
+from .notifications import user_group_name
+
+logger = logging.getLogger(__name__)
+
+# Soluciones en evaluación cuyo progreso se reenvía al conectar
+MAX_REPLAYED_SOLUTIONS = 10
+
+
+class UserConsumer(AsyncWebsocketConsumer):
+    """
+    Socket único por usuario. Recibe el progreso de todas sus soluciones en
+    evaluación y las actualizaciones de estadísticas y ranking, como mensajes
+    etiquetados con `type`: "solution", "stats", "rank" o "run" (resultado de una
+    ejecución de prueba, ver solutions.views.RunSolutionView).
+    """
+
+    async def connect(self):
+        self.user_id = self.scope.get('user_id')
+        if self.user_id is None:
+            await self.close(code=4401)
+            return
+
+        self.group_name = user_group_name(self.user_id)
+        # Última posición reenviada por solución; los eventos en vivo anteriores se descartan
+        self.replayed_until = {}
+
+        await self.channel_layer.group_add(self.group_name, self.channel_name)
+        await self.accept()
+        await self.replay_pending_solutions()
+
+    async def disconnect(self, close_code):
+        if getattr(self, 'group_name', None):
+            await self.channel_layer.group_discard(self.group_name, self.channel_name)
+
+    @database_sync_to_async
+    def pending_solution_ids(self):
+        from solutions.models import Solution
+        return list(
+            Solution.objects.filter(user_id=self.user_id, status='Pending')
+            .order_by('-id')
+            .values_list('id', flat=True)[:MAX_REPLAYED_SOLUTIONS]
+        )
+
+    async def replay_pending_solutions(self):
+        """Reenvía el progreso ya publicado de las soluciones que siguen en evaluación."""
+        try:
+            solution_ids = await self.pending_solution_ids()
+            for solution_id in reversed(solution_ids):
+                entries = await read_progress(solution_id)
+                for _, frame in entries:
+                    await self.send(text_data=tag_frame(frame, type="solution", solution_id=solution_id))
+                if entries:
+                    self.replayed_until[solution_id] = stream_position(entries[-1][0])
+        except Exception as e:
+            logger.error(f"Could not replay progress for user {self.user_id}: {str(e)}")
+
+    async def user_solution_batch(self, event):
+        """Progreso agrupado de una solución, ya etiquetado (ver solutions.progress.ProgressPublisher)."""
+        replayed_until = self.replayed_until.get(event["solution_id"])
+        for entry_id, frame in event["entries"]:
+            if not is_replayed(entry_id, replayed_until):
+                await self.send(text_data=frame)
+
+    async def user_event(self, event):
+        """Mensaje ya serializado y etiquetado (ver users.notifications.send_user_event)."""
+        await self.send(text_data=event["frame"])
@@ -0,0 +1,115 @@
+import logging
+import uuid
+
+from django.conf import settings
+
+from tukey_web.redis_client import get_redis
+
+logger = logging.getLogger(__name__)
+
+# Sorted set con los puntos de experiencia de cada usuario (miembro: id, score: puntos)
+LEADERBOARD_KEY = getattr(settings, 'LEADERBOARD_KEY', 'leaderboard:xp')
+# Tiempo máximo que puede tardar una reconstrucción antes de liberar el candado (segundos)
+REBUILD_LOCK_TTL = 300
+# Miembro con score -inf que marca un índice completo; sin él se reconstruye desde la base de datos
+_BUILT_MEMBER = '__built__'
+
+
+def _lock_key():
+    return f"{LEADERBOARD_KEY}:rebuild_lock"
+
+
+def _building_key():
+    return f"{LEADERBOARD_KEY}:building"
+
+
+def _dirty_key():
+    return f"{LEADERBOARD_KEY}:dirty"
+
+
+def rebuild_leaderboard(batch_size=1000):
+    """
+    Carga los puntos de todos los usuarios en un sorted set nuevo y lo reemplaza de
+    una vez, así las consultas nunca ven un índice a medias. Los usuarios que cambian
+    durante la carga se vuelven a leer al final. Devuelve False si otro proceso ya
+    está reconstruyendo.
+    """
+    from .models import CustomUser
+
+    redis = get_redis()
+    token = uuid.uuid4().hex
+    if not redis.set(_lock_key(), token, nx=True, ex=REBUILD_LOCK_TTL):
+        return False
+
+    try:
+        redis.delete(_building_key(), _dirty_key())
+        redis.zadd(_building_key(), {_BUILT_MEMBER: '-inf'})
+        scores = {}
+        users = CustomUser.objects.order_by('pk').values_list('pk', 'puntos_experiencia')
+        for user_id, puntos in users.iterator(chunk_size=batch_size):
+            scores[user_id] = puntos
+            if len(scores) >= batch_size:
+                redis.zadd(_building_key(), scores)
+                scores = {}
+        if scores:
+            redis.zadd(_building_key(), scores)
+        redis.rename(_building_key(), LEADERBOARD_KEY)
+
+        pipe = redis.pipeline()
+        pipe.smembers(_dirty_key())
+        pipe.delete(_dirty_key())
+        dirty, _ = pipe.execute()
+        if dirty:
+            redis.zadd(LEADERBOARD_KEY, dict(
+                CustomUser.objects.filter(pk__in=dirty).values_list('pk', 'puntos_experiencia')
+            ))
+    finally:
+        if redis.get(_lock_key()) == token:
+            redis.delete(_lock_key())
+    logger.info("Leaderboard reconstruido desde la base de datos.")
+    return True
+
+
+def update_score(user_id, puntos):
+    """Registra los puntos del usuario en el índice, O(log n). Un fallo de Redis solo se registra."""
+    try:
+        pipe = get_redis().pipeline()
+        pipe.zadd(LEADERBOARD_KEY, {user_id: puntos})
+        pipe.exists(_lock_key())
+        _, rebuilding = pipe.execute()
+        if rebuilding:
+            # La reconstrucción en curso pudo leer un valor anterior; se relee al terminar
+            get_redis().sadd(_dirty_key(), user_id)
+    except Exception:
+        logger.exception(f"No se pudo actualizar el leaderboard del usuario {user_id}")
+
+
+def remove_user(user_id):
+    try:
+        get_redis().zrem(LEADERBOARD_KEY, user_id)
+    except Exception:
+        logger.exception(f"No se pudo quitar al usuario {user_id} del leaderboard")
+
+
+def get_rank(puntos):
+    """
+    Posición que corresponde a `puntos`: 1 más la cantidad de usuarios con más puntos,
+    así los empates comparten posición (1, 2, 2, 4). Es O(log n) sobre el sorted set;
+    si el índice no está completo se reconstruye, y si Redis falla se cuenta en la base
+    de datos.
+    """
+    try:
+        redis = get_redis()
+        pipe = redis.pipeline(transaction=False)
+        pipe.zscore(LEADERBOARD_KEY, _BUILT_MEMBER)
+        pipe.zcount(LEADERBOARD_KEY, f"({puntos}", '+inf')
+        built, above = pipe.execute()
+        if built is not None:
+            return above + 1
+        if rebuild_leaderboard():
+            return redis.zcount(LEADERBOARD_KEY, f"({puntos}", '+inf') + 1
+    except Exception:
+        logger.exception("No se pudo consultar el leaderboard; se cuenta en la base de datos")
+
+    from .models import CustomUser
+    return CustomUser.objects.filter(puntos_experiencia__gt=puntos).count() + 1
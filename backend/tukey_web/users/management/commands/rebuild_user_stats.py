@@ -0,0 +1,21 @@
+from django.core.management.base import BaseCommand
+
+from solutions.models import Solution
+from users.models import CustomUser
+from users.stats import rebuild_user_counters
+
+
+class Command(BaseCommand):
+    help = (
+        "Recalcula desde las soluciones los contadores de cada usuario (intentos, aceptadas, "
+        "problemas resueltos y tasa de éxito), que el juez mantiene de forma incremental."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='user_ids',
+                            help='Id del usuario a reconstruir; se puede repetir. Por defecto, todos.')
+        parser.add_argument('--batch-size', type=int, default=500)
+
+    def handle(self, *args, user_ids=None, batch_size=500, **options):
+        updated = rebuild_user_counters(CustomUser, Solution, user_ids, batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Estadísticas reconstruidas para {updated} usuarios."))
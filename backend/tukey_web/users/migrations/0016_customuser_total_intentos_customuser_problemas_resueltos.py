@@ -0,0 +1,59 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:20
+
+from django.db import migrations, models
+from django.db.models import Count, Q
+
+
+def backfill_counters(apps, schema_editor):
+    # Los contadores ahora se suman de forma incremental; parten de los valores reales.
+    # Copia fija del recálculo de users.stats, para que la migración no cambie con el código
+    CustomUser = apps.get_model('users', 'CustomUser')
+    Solution = apps.get_model('solutions', 'Solution')
+    fields = ['total_intentos', 'ejercicios_completados', 'problemas_resueltos', 'tasa_exito']
+
+    stats = {
+        row['user_id']: row
+        for row in Solution.objects.exclude(status='Pending').values('user_id').annotate(
+            total_intentos=Count('id'),
+            soluciones_aceptadas=Count('id', filter=Q(status='Accepted')),
+            problemas_resueltos=Count('problem', filter=Q(status='Accepted'), distinct=True),
+        )
+    }
+
+    batch = []
+    for user in CustomUser.objects.order_by('pk').only('pk', *fields).iterator(chunk_size=500):
+        row = stats.get(user.pk)
+        intentos = row['total_intentos'] if row else 0
+        aceptadas = row['soluciones_aceptadas'] if row else 0
+        user.total_intentos = intentos
+        user.ejercicios_completados = aceptadas
+        user.problemas_resueltos = row['problemas_resueltos'] if row else 0
+        user.tasa_exito = round(aceptadas / intentos * 100, 2) if intentos else 0.0
+        batch.append(user)
+        if len(batch) >= 500:
+            CustomUser.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        CustomUser.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0015_alter_customuser_avatar'),
+        ('solutions', '0003_alter_solutiontestcaseresult_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='total_intentos',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='customuser',
+            name='problemas_resueltos',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
@@ -1,11 +1,15 @@
 from django.contrib.auth.models import AbstractUser
 from django.db import models
-from django.db.models import Count, Q
+from django.db.models import Case, F, FloatField, Value, When
+from django.db.models.functions import Cast, Round
 from django.utils.timezone import now
 from datetime import timedelta
 import json
 from datetime import datetime
 
+from .leaderboard import get_rank, update_score
+from .stats import COUNTER_FIELDS, rebuild_user_counters
+
 def user_avatar_upload_path(instance, filename):
     """
     Define el directorio donde se guardará el avatar del usuario.
@@ -40,6 +44,8 @@ class CustomUser(AbstractUser):
 
     # Estadísticas del usuario
     ejercicios_completados = models.IntegerField(default=0)  # Ejercicios aceptados
+    total_intentos = models.IntegerField(default=0)  # Soluciones calificadas
+    problemas_resueltos = models.IntegerField(default=0)  # Problemas distintos con alguna solución aceptada
     tasa_exito = models.FloatField(default=0.0)  # Porcentaje de éxito
     last_exercise_date = models.DateField(null=True, blank=True)  # Último ejercicio resuelto
     racha = models.IntegerField(default=0)  # Días consecutivos resolviendo problemas
@@ -52,102 +58,102 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return self.username
 
+    # Límite superior de puntos de cada nivel; a partir del último se es "Maestro"
+    NIVELES = (
+        (100, "Básico"),
+        (500, "Intermedio"),
+        (1000, "Avanzado"),
+        (2000, "Experto"),
+    )
+    NIVEL_MAXIMO = "Maestro"
+
     def actualizar_estadisticas(self):
         """
-        Actualiza las estadísticas del usuario basadas en sus soluciones.
+        Recalcula desde cero los contadores del usuario a partir de sus soluciones.
+        El juez los mantiene de forma incremental (ver registrar_veredictos); el
+        recálculo es el mismo del comando rebuild_user_stats (ver users.stats).
         """
         from solutions.models import Solution  # Importación local para evitar circularidad
 
-        stats = Solution.objects.filter(user=self).aggregate(
-            total_intentos=Count('id'),
-            soluciones_aceptadas=Count('id', filter=Q(status='Accepted'))
-        )
+        rebuild_user_counters(CustomUser, Solution, [self.pk])
+        self.refresh_from_db(fields=COUNTER_FIELDS)
 
-        self.ejercicios_completados = stats['soluciones_aceptadas'] or 0
-        self.tasa_exito = (
-            round((stats['soluciones_aceptadas'] / stats['total_intentos']) * 100, 2)
-            if stats['total_intentos'] > 0 else 0.0
-        )
-        
-        # Actualizar nivel y ranking
-        self.nivel = self._calcular_nivel()
-        self.actualizar_ranking()
-        
-        # Actualizar racha diaria
-        self.actualizar_racha()
-        
-        # Registrar ejercicio resuelto con la fecha actual
-        fecha_actual = now().date()
-        self.registrar_ejercicio_resuelto(fecha=fecha_actual)
-        
-        self.save()
-
-    def registrar_ejercicio_resuelto(self, fecha=None, tiempo_ejercicio=0):
+    @classmethod
+    def registrar_veredictos(cls, user_id, intentos, aceptadas, problemas_nuevos, experiencia=0, fecha=None):
+        """
+        Suma una tanda de soluciones calificadas con un solo UPDATE, sin recontar el
+        historial: intentos, aceptadas, problemas resueltos, tasa de éxito, experiencia,
+        nivel, racha y actividad de los últimos días. La actividad se lee y se reescribe,
+        así que quien llama debe tener bloqueada la fila del usuario (ver users.tasks).
+        """
+        if intentos <= 0:
+            return 0
         if fecha is None:
             fecha = now().date()
 
-        # Asegurar que tenemos un diccionario válido
-        if not isinstance(self.ejercicios_resueltos_ultimos_siete_dias, dict):
-            self.ejercicios_resueltos_ultimos_siete_dias = {}
+        # La actividad diaria es un JSON; se actualiza en Python sobre el valor actual
+        actividad = cls.objects.filter(pk=user_id).values_list(
+            'ejercicios_resueltos_ultimos_siete_dias', flat=True
+        ).first()
+
+        total_intentos = F('total_intentos') + intentos
+        aceptadas_total = F('ejercicios_completados') + aceptadas
+
+        return cls.objects.filter(pk=user_id).update(
+            total_intentos=total_intentos,
+            ejercicios_completados=aceptadas_total,
+            problemas_resueltos=F('problemas_resueltos') + problemas_nuevos,
+            tasa_exito=Round(Cast(aceptadas_total, FloatField()) * 100 / total_intentos, 2),
+            puntos_experiencia=F('puntos_experiencia') + experiencia,
+            nivel=cls._nivel_con(experiencia),
+            racha=Case(
+                When(last_exercise_date=fecha, then=F('racha')),
+                When(last_exercise_date=fecha - timedelta(days=1), then=F('racha') + 1),
+                default=Value(1),
+            ),
+            last_exercise_date=fecha,
+            ejercicios_resueltos_ultimos_siete_dias=cls._sumar_actividad(actividad, fecha, intentos),
+        )
 
-        # Validar tiempo
-        tiempo_ejercicio = max(0, tiempo_ejercicio)
-        self.tiempo_total += tiempo_ejercicio
+    @classmethod
+    def sumar_experiencia(cls, user_id, experiencia):
+        """Suma (o resta) experiencia y ajusta el nivel con un solo UPDATE, p. ej. al reevaluar."""
+        return cls.objects.filter(pk=user_id).update(
+            puntos_experiencia=F('puntos_experiencia') + experiencia,
+            nivel=cls._nivel_con(experiencia),
+        )
+
+    @classmethod
+    def _nivel_con(cls, experiencia):
+        """Nivel que corresponde a los puntos actuales más `experiencia`, como expresión SQL."""
+        return Case(
+            *[When(**{'puntos_experiencia__lt': limite - experiencia}, then=Value(nivel))
+              for limite, nivel in cls.NIVELES],
+            default=Value(cls.NIVEL_MAXIMO),
+        )
+
+    @staticmethod
+    def _sumar_actividad(registros, fecha, cantidad=1):
+        """Suma `cantidad` ejercicios al día `fecha` y descarta los registros de más de 7 días."""
+        if not isinstance(registros, dict):
+            registros = {}
 
-        # Convertir fecha a string en formato ISO
-        fecha_str = fecha.isoformat()
-        
-        # Limpiar registros antiguos
         fecha_limite = fecha - timedelta(days=7)
-        ejercicios_actualizados = {}
-        
-        # Filtrar y mantener solo los últimos 7 días
-        for fecha_registro, conteo in self.ejercicios_resueltos_ultimos_siete_dias.items():
+        actividad = {}
+        for fecha_registro, conteo in registros.items():
             try:
-                fecha_registro_date = datetime.fromisoformat(fecha_registro).date()
-                if fecha_registro_date > fecha_limite:
-                    ejercicios_actualizados[fecha_registro] = conteo
+                if datetime.fromisoformat(fecha_registro).date() > fecha_limite:
+                    actividad[fecha_registro] = conteo
             except ValueError:
                 continue  # Ignorar fechas inválidas
 
-        # Actualizar el registro del día actual
-        if fecha_str in ejercicios_actualizados:
-            ejercicios_actualizados[fecha_str] += 1
-        else:
-            ejercicios_actualizados[fecha_str] = 1
-
-        self.ejercicios_resueltos_ultimos_siete_dias = ejercicios_actualizados
-        self.last_exercise_date = fecha
-        self.save()
-
-    def actualizar_racha(self):
-        """
-        Actualiza la racha diaria del usuario.
-        - Si se completa un ejercicio hoy y fue consecutivo al día anterior o del mismo día, mantiene/aumenta la racha.
-        - Si no fue consecutivo, la racha se reinicia.
-        """
-        today = now().date()
+        fecha_str = fecha.isoformat()
+        actividad[fecha_str] = actividad.get(fecha_str, 0) + cantidad
+        return actividad
 
-        if self.last_exercise_date:
-            dias_diferencia = (today - self.last_exercise_date).days
-            
-            if dias_diferencia == 0:  # Mismo día
-                pass  # Mantener la racha actual
-            elif dias_diferencia == 1:  # Día consecutivo
-                self.racha += 1
-            else:  # Más de un día de diferencia
-                self.racha = 1
-        else:
-            # Primera vez que resuelve un ejercicio
-            self.racha = 1
-
-        self.last_exercise_date = today
-        self.save()
-    
-    def otorgar_experiencia(self, dificultad, execution_time=None, peak_memory=None):
-        """
-        Otorga puntos de experiencia al usuario y actualiza su nivel.
-        """
+    @staticmethod
+    def calcular_experiencia(dificultad, execution_time=None, peak_memory=None):
+        """Puntos de experiencia que da una solución aceptada."""
         experiencia_por_dificultad = {
             'Easy': 10,
             'Medium': 20,
@@ -161,12 +167,7 @@ class CustomUser(AbstractUser):
             puntos += 5
         if peak_memory and peak_memory < 10.0:
             puntos += 5
-    
-        self.puntos_experiencia += puntos
-        # Actualizar el nivel después de añadir puntos
-        self.nivel = self._calcular_nivel()
-        self.save()
-    
+
         return puntos
 
     def _calcular_nivel(self):
@@ -179,24 +180,18 @@ class CustomUser(AbstractUser):
         - Experto: 1000-1999 puntos
         - Maestro: 2000+ puntos
         """
-        if self.puntos_experiencia < 100:
-            return "Básico"
-        elif self.puntos_experiencia < 500:
-            return "Intermedio"
-        elif self.puntos_experiencia < 1000:
-            return "Avanzado"
-        elif self.puntos_experiencia < 2000:
-            return "Experto"
-        else:
-            return "Maestro"
+        for limite, nivel in self.NIVELES:
+            if self.puntos_experiencia < limite:
+                return nivel
+        return self.NIVEL_MAXIMO
 
     def actualizar_ranking(self):
         """
-        Actualiza el ranking del usuario basado en sus puntos de experiencia.
+        Registra los puntos del usuario en el leaderboard y guarda su posición actual.
+        La columna `ranking` es solo una copia; la posición vigente está en users.leaderboard.
         """
-        ranking = CustomUser.objects.filter(
-            puntos_experiencia__gt=self.puntos_experiencia
-        ).count() + 1
+        update_score(self.pk, self.puntos_experiencia)
+        ranking = get_rank(self.puntos_experiencia)
         # Actualizar directamente el ranking en la base de datos
         CustomUser.objects.filter(pk=self.pk).update(ranking=ranking)
 
@@ -0,0 +1,50 @@
+import logging
+
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+
+from solutions.events import dumps
+
+logger = logging.getLogger(__name__)
+
+# Campos del usuario que viajan en los mensajes "stats"
+USER_STATS_FIELDS = (
+    'puntos_experiencia',
+    'nivel',
+    'racha',
+    'ejercicios_completados',
+    'tasa_exito',
+)
+
+
+def user_group_name(user_id):
+    return f"user_{user_id}"
+
+
+def send_user_event(user_id, kind, data):
+    """
+    Envía un mensaje etiquetado con `type` al socket del usuario (ver users.consumers).
+    Un fallo del channel layer no debe interrumpir a quien notifica.
+    """
+    try:
+        async_to_sync(get_channel_layer().group_send)(
+            user_group_name(user_id),
+            {
+                "type": "user_event",
+                "frame": dumps(dict(data, type=kind)),
+            },
+        )
+    except Exception:
+        logger.exception(f"No se pudo notificar al usuario {user_id}")
+
+
+def send_stats_update(user_id):
+    """Envía las estadísticas actuales del usuario y su posición en el leaderboard."""
+    from .leaderboard import get_rank
+    from .models import CustomUser
+
+    stats = CustomUser.objects.filter(pk=user_id).values(*USER_STATS_FIELDS).first()
+    if stats is None:
+        return
+    send_user_event(user_id, 'stats', stats)
+    send_user_event(user_id, 'rank', {'ranking': get_rank(stats['puntos_experiencia'])})
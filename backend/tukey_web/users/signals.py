@@ -1,17 +1,22 @@
-from django.db.models.signals import post_save, pre_delete
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from .models import CustomUser
+from .leaderboard import remove_user, update_score
 from django.core.files.storage import default_storage
 import os
 
 @receiver(post_save, sender=CustomUser)
-def update_user_ranking(sender, instance, created, **kwargs):
+def update_leaderboard(sender, instance, update_fields=None, **kwargs):
     """
-    Actualiza el ranking de todos los usuarios cuando se crea o modifica un usuario
+    Registra los puntos del usuario en el leaderboard (ver users.leaderboard).
+    Las posiciones se calculan al consultarlas, así que no se recorre a los demás usuarios.
     """
-    if not created and not instance._state.adding:
-        # Actualizar el ranking solo si el usuario ya existe y no está siendo creado
-        instance.actualizar_ranking()
+    if update_fields is None or 'puntos_experiencia' in update_fields:
+        update_score(instance.pk, instance.puntos_experiencia)
+
+@receiver(post_delete, sender=CustomUser)
+def remove_from_leaderboard(sender, instance, **kwargs):
+    remove_user(instance.pk)
 
 @receiver(pre_delete, sender=CustomUser)
 def delete_user_avatar(sender, instance, **kwargs):
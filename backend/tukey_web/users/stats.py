@@ -0,0 +1,48 @@
+from django.db.models import Count, Q
+
+# Contadores que el juez suma de forma incremental y que rebuild_user_counters recalcula
+COUNTER_FIELDS = ['total_intentos', 'ejercicios_completados', 'problemas_resueltos', 'tasa_exito']
+
+
+def rebuild_user_counters(user_model, solution_model, user_ids=None, batch_size=500):
+    """
+    Recalcula desde las soluciones los contadores de los usuarios con un solo GROUP BY
+    y los guarda con bulk_update. Recibe los modelos porque users.models importa este
+    módulo. Devuelve cuántos usuarios actualizó. La migración 0016 tiene su propia
+    copia fija del recálculo.
+    """
+    users = user_model.objects.order_by('pk')
+    # Las soluciones pendientes todavía no cuentan como intento
+    solutions = solution_model.objects.exclude(status='Pending')
+    if user_ids is not None:
+        users = users.filter(pk__in=user_ids)
+        solutions = solutions.filter(user_id__in=user_ids)
+
+    stats = {
+        row['user_id']: row
+        for row in solutions.values('user_id').annotate(
+            total_intentos=Count('id'),
+            soluciones_aceptadas=Count('id', filter=Q(status='Accepted')),
+            problemas_resueltos=Count('problem', filter=Q(status='Accepted'), distinct=True),
+        )
+    }
+
+    batch = []
+    updated = 0
+    for user in users.only('pk', *COUNTER_FIELDS).iterator(chunk_size=batch_size):
+        row = stats.get(user.pk)
+        intentos = row['total_intentos'] if row else 0
+        aceptadas = row['soluciones_aceptadas'] if row else 0
+        user.total_intentos = intentos
+        user.ejercicios_completados = aceptadas
+        user.problemas_resueltos = row['problemas_resueltos'] if row else 0
+        user.tasa_exito = round(aceptadas / intentos * 100, 2) if intentos else 0.0
+        batch.append(user)
+        if len(batch) >= batch_size:
+            user_model.objects.bulk_update(batch, COUNTER_FIELDS)
+            updated += len(batch)
+            batch = []
+    if batch:
+        user_model.objects.bulk_update(batch, COUNTER_FIELDS)
+        updated += len(batch)
+    return updated
@@ -0,0 +1,164 @@
+import logging
+
+from celery import shared_task
+from celery.signals import worker_ready
+from django.conf import settings
+from django.db import transaction
+
+from tukey_web.redis_client import get_redis
+from .leaderboard import rebuild_leaderboard
+from .notifications import send_stats_update
+
+logger = logging.getLogger(__name__)
+
+# Espera antes de aplicar las estadísticas, para juntar varias soluciones del mismo usuario
+STATS_COALESCE_SECONDS = getattr(settings, 'USER_STATS_COALESCE_SECONDS', 2)
+# Vida de la marca de agendado: si la tarea se pierde, la siguiente solución agenda otra
+SCHEDULED_TTL_SECONDS = max(10, STATS_COALESCE_SECONDS * 5)
+# Vida máxima de la lista de soluciones pendientes si la etapa no llega a correr
+PENDING_TTL_SECONDS = 60 * 60 * 24
+
+
+@worker_ready.connect
+def load_leaderboard(**kwargs):
+    """Al iniciar el worker, el leaderboard se reconstruye desde la base de datos."""
+    try:
+        rebuild_leaderboard()
+    except Exception:
+        logger.exception("No se pudo reconstruir el leaderboard")
+
+
+def _pending_key(user_id):
+    return f"judged_solutions:{user_id}"
+
+
+def _scheduled_key(user_id):
+    return f"judged_solutions_scheduled:{user_id}"
+
+
+def schedule_user_stats(user_id, solution_id):
+    """
+    Registra una solución calificada y agenda la actualización de estadísticas del
+    usuario. Si ya hay una agendada, la solución se suma a esa en lugar de crear otra.
+    """
+    try:
+        pipe = get_redis().pipeline()
+        pipe.rpush(_pending_key(user_id), solution_id)
+        pipe.expire(_pending_key(user_id), PENDING_TTL_SECONDS)
+        pipe.set(_scheduled_key(user_id), 1, nx=True, ex=SCHEDULED_TTL_SECONDS)
+        _, _, scheduled = pipe.execute()
+    except Exception:
+        # Sin Redis no se agrupa: la solución viaja en la propia tarea
+        logger.exception(f"No se pudo agrupar la solución {solution_id}; se aplica por separado")
+        apply_judged_solutions.delay(user_id, [solution_id])
+        return
+
+    if scheduled:
+        apply_judged_solutions.apply_async((user_id,), countdown=STATS_COALESCE_SECONDS)
+
+
+def read_judged_solutions(user_id):
+    """
+    Lee las soluciones pendientes del usuario sin quitarlas; se quitan con
+    forget_judged_solutions después de aplicarlas. Libera la marca de agendado,
+    así una solución que llegue después agenda otra tarea.
+    """
+    pipe = get_redis().pipeline()
+    pipe.delete(_scheduled_key(user_id))
+    pipe.lrange(_pending_key(user_id), 0, -1)
+    _, solution_ids = pipe.execute()
+    return [int(solution_id) for solution_id in solution_ids]
+
+
+def forget_judged_solutions(user_id, solution_ids):
+    """Quita de la lista pendiente las soluciones ya aplicadas, sin tocar las que llegaron después."""
+    try:
+        pipe = get_redis().pipeline()
+        for solution_id in solution_ids:
+            pipe.lrem(_pending_key(user_id), 1, solution_id)
+        pipe.execute()
+    except Exception:
+        # Quedan en la lista, pero stats_applied evita contarlas otra vez
+        logger.exception(f"No se pudieron quitar las soluciones aplicadas del usuario {user_id}")
+
+
+@shared_task(bind=True, ignore_result=True, max_retries=3, default_retry_delay=STATS_COALESCE_SECONDS)
+def apply_judged_solutions(self, user_id, solution_ids=None):
+    """
+    Aplica en una sola pasada las estadísticas, experiencia, racha y ranking de las
+    soluciones calificadas del usuario, y le envía los valores nuevos. Los contadores
+    se suman de forma incremental; rebuild_user_stats los recalcula desde cero.
+
+    Todo se aplica en una transacción que marca las soluciones con stats_applied, así
+    una solución nunca se cuenta dos veces aunque dos tareas la lean. Las soluciones
+    salen de la lista pendiente solo después de confirmar; si algo falla, se quedan
+    ahí y la tarea se reintenta.
+    """
+    from solutions.models import Solution
+    from .models import CustomUser
+
+    from_queue = solution_ids is None
+    if from_queue:
+        solution_ids = read_judged_solutions(user_id)
+    if not solution_ids:
+        return
+
+    try:
+        with transaction.atomic():
+            experiencia, updated = _apply_solutions(Solution, CustomUser, user_id, solution_ids)
+    except Exception as exc:
+        logger.exception(f"No se pudieron aplicar las estadísticas del usuario {user_id}")
+        raise self.retry(exc=exc, args=(user_id, solution_ids))
+
+    if from_queue:
+        forget_judged_solutions(user_id, solution_ids)
+    if not updated:
+        return
+    if experiencia:
+        logger.info(f"Se otorgaron {experiencia} puntos de experiencia al usuario {user_id}.")
+        CustomUser.objects.only('id', 'puntos_experiencia').get(pk=user_id).actualizar_ranking()
+
+    send_stats_update(user_id)
+
+
+def _apply_solutions(Solution, CustomUser, user_id, solution_ids):
+    """Suma las soluciones aún no aplicadas; devuelve la experiencia otorgada y si hubo cambios."""
+    # El bloqueo del usuario hace esperar a otra tarea del mismo usuario hasta que esta
+    # confirme: la actividad diaria se lee y se reescribe, y "problema nuevo" depende de
+    # las soluciones ya aplicadas
+    try:
+        CustomUser.objects.select_for_update().only('id').get(pk=user_id)
+    except CustomUser.DoesNotExist:
+        return 0, 0
+    solutions = list(
+        Solution.objects.select_for_update(of=('self',))
+        .filter(id__in=solution_ids, user_id=user_id, stats_applied=False)
+        .exclude(status='Pending')
+        .select_related('problem')
+        .only('id', 'status', 'time', 'memory', 'problem_id', 'problem__difficulty')
+    )
+    if not solutions:
+        return 0, 0
+
+    accepted = [solution for solution in solutions if solution.status == 'Accepted']
+    solved = {solution.problem_id for solution in accepted}
+    already_solved = set(
+        Solution.objects.filter(user_id=user_id, status='Accepted', stats_applied=True, problem_id__in=solved)
+        .values_list('problem_id', flat=True)
+        .distinct()
+    )
+    experiencia = sum(
+        CustomUser.calcular_experiencia(solution.problem.difficulty, solution.time, solution.memory)
+        for solution in accepted
+    )
+
+    Solution.objects.filter(id__in=[solution.id for solution in solutions]).update(stats_applied=True)
+    # Contadores, experiencia, nivel y racha en un solo UPDATE (ver CustomUser.registrar_veredictos)
+    updated = CustomUser.registrar_veredictos(
+        user_id,
+        intentos=len(solutions),
+        aceptadas=len(accepted),
+        problemas_nuevos=len(solved - already_solved),
+        experiencia=experiencia,
+    )
+    return experiencia, updated
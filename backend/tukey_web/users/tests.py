@@ -1,3 +1,97 @@
+from datetime import date, timedelta
+from unittest import mock
+
 from django.test import TestCase
 
-# Create your tests here.
+from problems.models import Problem
+from solutions.models import Solution
+
+from .models import CustomUser
+from .stats import COUNTER_FIELDS, rebuild_user_counters
+from .tasks import apply_judged_solutions
+
+
+class UserStatsTestMixin:
+    def setUp(self):
+        # El leaderboard vive en Redis; aquí solo importan los contadores en la base de datos
+        for target in ('users.signals.update_score', 'users.tasks.send_stats_update'):
+            patcher = mock.patch(target)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        patcher = mock.patch.object(CustomUser, 'actualizar_ranking')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.user = CustomUser.objects.create(username='ana', email='ana@example.com')
+        self.problem = Problem.objects.create(title='Suma', description='Suma la lista', difficulty='Easy')
+        self.other_problem = Problem.objects.create(title='Resta', description='Resta', difficulty='Medium')
+
+    def judged(self, status, problem=None):
+        return Solution.objects.create(
+            user=self.user, problem=problem or self.problem, language='python', code='', status=status
+        )
+
+    def counters(self):
+        return CustomUser.objects.values(*COUNTER_FIELDS).get(pk=self.user.pk)
+
+
+class RegistrarVeredictosTests(UserStatsTestMixin, TestCase):
+    def test_adds_batch_to_counters(self):
+        CustomUser.registrar_veredictos(self.user.pk, intentos=3, aceptadas=1, problemas_nuevos=1, experiencia=120)
+        CustomUser.registrar_veredictos(self.user.pk, intentos=1, aceptadas=1, problemas_nuevos=0)
+
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.total_intentos, 4)
+        self.assertEqual(self.user.ejercicios_completados, 2)
+        self.assertEqual(self.user.problemas_resueltos, 1)
+        self.assertEqual(self.user.tasa_exito, 50.0)
+        self.assertEqual(self.user.puntos_experiencia, 120)
+        self.assertEqual(self.user.nivel, 'Intermedio')
+
+    def test_streak_counts_consecutive_days(self):
+        today = date(2026, 10, 18)
+        for fecha in (today - timedelta(days=2), today - timedelta(days=1), today, today):
+            CustomUser.registrar_veredictos(self.user.pk, intentos=1, aceptadas=0, problemas_nuevos=0, fecha=fecha)
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.racha, 3)
+
+        CustomUser.registrar_veredictos(
+            self.user.pk, intentos=1, aceptadas=0, problemas_nuevos=0, fecha=today + timedelta(days=2)
+        )
+        self.user.refresh_from_db()
+        self.assertEqual(self.user.racha, 1)
+
+
+class ApplyJudgedSolutionsTests(UserStatsTestMixin, TestCase):
+    def test_counts_match_full_rebuild(self):
+        solutions = [
+            self.judged('Wrong Answer'),
+            self.judged('Accepted'),
+            self.judged('Accepted'),
+            self.judged('Time Limit Exceeded', self.other_problem),
+        ]
+        apply_judged_solutions(self.user.pk, [solutions[0].id, solutions[1].id])
+        apply_judged_solutions(self.user.pk, [solutions[2].id, solutions[3].id])
+        incremental = self.counters()
+
+        self.assertEqual(incremental['total_intentos'], 4)
+        self.assertEqual(incremental['ejercicios_completados'], 2)
+        self.assertEqual(incremental['problemas_resueltos'], 1)
+
+        rebuild_user_counters(CustomUser, Solution, [self.user.pk])
+        self.assertEqual(self.counters(), incremental)
+
+    def test_solution_is_applied_once(self):
+        solution = self.judged('Accepted')
+        apply_judged_solutions(self.user.pk, [solution.id])
+        apply_judged_solutions(self.user.pk, [solution.id])
+
+        self.assertEqual(self.counters()['total_intentos'], 1)
+        self.assertTrue(Solution.objects.get(pk=solution.pk).stats_applied)
+
+    def test_pending_solutions_are_not_counted(self):
+        solution = self.judged('Pending')
+        apply_judged_solutions(self.user.pk, [solution.id])
+
+        self.assertEqual(self.counters()['total_intentos'], 0)
+        self.assertFalse(Solution.objects.get(pk=solution.pk).stats_applied)
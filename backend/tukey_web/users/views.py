@@ -5,6 +5,7 @@ from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework import status, generics, viewsets
 from .models import CustomUser
+from .leaderboard import get_rank
 from .serializers import CustomUserSerializer, CustomTokenObtainPairSerializer
 from django.contrib.auth.password_validation import validate_password
 from django.core.exceptions import ValidationError
@@ -90,7 +91,7 @@ class UserProfileView(APIView):
             "name": user.name,
             "last_name": user.last_name,
             "nivel": user.nivel,
-            "ranking": user.ranking,
+            "ranking": get_rank(user.puntos_experiencia),
             "puntos_experiencia": user.puntos_experiencia,
             "racha": user.racha,
             "ejercicios_completados": user.ejercicios_completados,
@@ -248,7 +249,7 @@ class UserRankingView(APIView):
     permission_classes = [IsAuthenticated]
 
     def get(self, request):
-        users = CustomUser.objects.all().order_by('-puntos_experiencia')  # Ordenar por puntos_experiencia en orden descendente
+        users = CustomUser.objects.all().order_by('-puntos_experiencia', 'pk')  # Ordenar por puntos_experiencia en orden descendente
         ranking = [
             {
                 "username": user.username,